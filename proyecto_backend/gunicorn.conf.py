@@ -0,0 +1,52 @@
+import os
+import multiprocessing
+
+# Modo de producción de la API (desde proyecto_backend):
+#     gunicorn -c gunicorn.conf.py
+# La app se crea una sola vez en el proceso maestro (preload_app) y los
+# workers se obtienen con fork, así comparten en copy-on-write la app,
+# los artefactos y, con MODEL_BACKEND=tflite, los modelos ya cargados.
+# TensorFlow no soporta fork: con MODEL_BACKEND=keras cada worker carga
+# sus modelos después del fork, así que no hay copy-on-write y la memoria
+# de los modelos se multiplica por WEB_WORKERS (y el primer pronóstico de
+# cada worker espera su carga). Es el caso del Dockerfile por defecto;
+# para compartir los modelos entre workers hay que usar MODEL_BACKEND=tflite
+# (modelos de src/board/export_tflite.py), que se cargan antes del fork.
+
+cores = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_WORKERS", cores))
+# La inferencia corre en un pool acotado de cada worker (INFERENCE_WORKERS
+# en ejecución + INFERENCE_QUEUE en espera). Cada petición /predict ocupa
+# un hilo del servidor mientras espera su resultado (también las de COM
+# que esperan un micro-lote), así que se dejan 4 hilos más que esos lugares
+# para /results y los health checks; con mucho tráfico de COM conviene
+# subir WEB_THREADS para que los micro-lotes crezcan
+os.environ.setdefault("INFERENCE_WORKERS", "4")
+os.environ.setdefault("INFERENCE_QUEUE", "16")
+inference_slots = int(os.environ["INFERENCE_WORKERS"]) + int(os.environ["INFERENCE_QUEUE"])
+threads = int(os.environ.get("WEB_THREADS", inference_slots + 4))
+worker_class = "gthread"
+timeout = int(os.environ.get("WEB_TIMEOUT", 120))
+preload_app = True
+pythonpath = "src"
+wsgi_app = "board:create_app()"
+
+# Leído por create_app: los hilos de fondo se inician en cada worker (post_fork).
+# El scheduler de pronósticos arranca en todos pero solo calcula el worker
+# que obtiene FORECAST_DIR/scheduler.lock; el resto lee los archivos publicados
+os.environ["SERVER_MODE"] = "prefork"
+os.environ.setdefault(
+    "MODEL_LOADING",
+    "eager" if os.environ.get("MODEL_BACKEND", "keras") == "tflite" else "background",
+)
+
+# Hilos de inferencia por worker: los núcleos se reparten entre workers
+os.environ.setdefault("INTRA_OP_THREADS", str(max(1, cores // workers)))
+os.environ.setdefault("INTER_OP_THREADS", "1")
+
+
+def post_fork(server, worker):
+    import board
+    board.start_background()
@@ -1,24 +1,31 @@
-import numpy as np
+# Ejecutar desde proyecto_backend: python -m src.COM.COM_model
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, LSTM, InputLayer, Dropout, BatchNormalization
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
 from tensorflow.keras.losses import MeanSquaredError
 from tensorflow.keras.metrics import RootMeanSquaredError
 from tensorflow.keras.optimizers import Adam
-from utilities import mv, rename_model, set_enviroment_var, get_enviroment_var
+from .utilities import mv, rename_model, set_enviroment_var, get_enviroment_var
+from ..GEN.input_pipeline import npy_dataset
+from ..GEN.precision import set_training_precision
 
 project_path = "./"
 df_position = project_path + "models_media/processed_datasets/COM/"
 past_models = project_path + "past_models/"
 
-def load_datasets():
-    x_train = np.load(df_position + "x_train.npy")
-    y_train = np.load(df_position + "y_train.npy")
-    x_val = np.load(df_position + "x_val.npy")
-    y_val = np.load(df_position + "y_val.npy")
-    return x_train, y_train, x_val, y_val
+def load_datasets(batch_size=32):
+    # tf.data pipelines over the memory mapped .npy files, the arrays
+    # are never fully loaded in RAM
+    train_ds = npy_dataset(df_position + "x_train.npy", df_position + "y_train.npy",
+                           batch_size=batch_size, shuffle=True)
+    val_ds = npy_dataset(df_position + "x_val.npy", df_position + "y_val.npy",
+                         batch_size=batch_size)
+    return train_ds, val_ds
+
+def build_model():
+    # float32, or mixed bfloat16 on CPU with TRAINING_PRECISION=mixed_bfloat16
+    set_training_precision()
 
-def creating_model(model_to_generate, x_train, y_train, x_val, y_val):
     # Create a more complex model
     model1 = Sequential()
     model1.add(InputLayer((47, 1)))
@@ -44,8 +51,13 @@ def creating_model(model_to_generate, x_train, y_train, x_val, y_val):
     
     model1.add(Dense(32, activation='relu'))
     model1.add(Dense(16, activation='relu'))
-    model1.add(Dense(1, activation='linear'))
-    
+    # The output stays float32 even with mixed precision
+    model1.add(Dense(1, activation='linear', dtype='float32'))
+    return model1
+
+def creating_model(model_to_generate, train_ds, val_ds):
+    model1 = build_model()
+
     # Create callbacks
     # Early stopping to prevent overfitting
     early_stopping = EarlyStopping(
@@ -71,11 +83,11 @@ def creating_model(model_to_generate, x_train, y_train, x_val, y_val):
     )
     
     # Fit the model with both callbacks
+    # The batch size is set in load_datasets
     history = model1.fit(
-        x_train, y_train, 
-        validation_data=(x_val, y_val), 
+        train_ds,
+        validation_data=val_ds,
         epochs=50,  # Increased epochs since we have early stopping
-        batch_size=32,  # Added batch size parameter
         callbacks=[cp, early_stopping],
         verbose=1
     )
@@ -84,19 +96,19 @@ def creating_model(model_to_generate, x_train, y_train, x_val, y_val):
 
 def manual_training():
     actual_model = get_enviroment_var("COM_MODEL")
-    x_train, y_train, x_val, y_val = load_datasets()
+    train_ds, val_ds = load_datasets()
     mv(project_path + actual_model, project_path + "past_models/" + actual_model)
     new_model_name = rename_model(actual_model, True)
     set_enviroment_var("COM_MODEL", new_model_name)
     
     model, history = creating_model(project_path + get_enviroment_var("COM_MODEL"), 
-                                   x_train, y_train, x_val, y_val)
+                                   train_ds, val_ds)
     
     return model, history
 
 def auto_training():
     actual_model = get_enviroment_var("COM_MODEL")
-    x_train, y_train, x_val, y_val = load_datasets()
+    train_ds, val_ds = load_datasets()
     
     mv(project_path + actual_model, project_path + "past_models/" + actual_model)
     
@@ -104,7 +116,7 @@ def auto_training():
     set_enviroment_var("COM_MODEL", new_model_name)
     
     model, history = creating_model(project_path + get_enviroment_var("COM_MODEL"), 
-                                   x_train, y_train, x_val, y_val)
+                                   train_ds, val_ds)
     
     return model, history
 
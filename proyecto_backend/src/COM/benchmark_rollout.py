@@ -0,0 +1,49 @@
+import time
+import numpy as np
+from tensorflow.keras.models import load_model
+from rollout import predict_loop, compile_rollout
+
+
+'''
+Compara la latencia del pronóstico recursivo de 48 pasos:
+el ciclo original con model.predict contra el rollout compilado.
+Se ejecuta desde proyecto_backend: python src/COM/benchmark_rollout.py
+'''
+
+model_to_use = "COM-3.0.keras"
+batch_sizes = [1, 16, 128]
+repeats = 3
+
+model = load_model(model_to_use)
+rollout = compile_rollout(model)
+
+# Misma escala de los datos de prueba del dashboard
+rng = np.random.default_rng(0)
+
+# La primera llamada incluye el trazado de la función
+start = time.perf_counter()
+rollout(rng.random((1, 47, 1)) / 3)
+print(f"Trazado del rollout compilado: {time.perf_counter() - start:.3f} s\n")
+
+
+def best_time(fn, x):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(x)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+print("|N|loop predict() (s)|rollout compilado (s)|speedup|max |diff||")
+print("---------------------------")
+for n in batch_sizes:
+    x = rng.random((n, 47, 1)) / 3
+
+    loop_pred = predict_loop(model, x)
+    compiled_pred = rollout(x)
+    diff = np.max(np.abs(loop_pred - compiled_pred))
+
+    t_loop = best_time(lambda seqs: predict_loop(model, seqs), x)
+    t_compiled = best_time(rollout, x)
+    print(f"| {n} | {t_loop:.4f} | {t_compiled:.4f} | {t_loop / t_compiled:.1f}x | {diff:.2e} |")
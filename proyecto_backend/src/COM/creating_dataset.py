@@ -1,22 +1,27 @@
-import pandas as pd
-import numpy as np 
+# Ejecutar desde proyecto_backend: python -m src.COM.creating_dataset
+import os
+import numpy as np
+from ..GEN.columnar import ensure_store, read_store
 
 
 
 df_path = "models_media/datasets/BANES Energy Data Electricity.csv"
+store_path = "models_media/datasets/BANES Energy Data Electricity/"
 df_result = "models_media/processed_datasets/COM/"
 
+#Columns that are useless for this model (they are not even read)
+dropped_columns = ["Column1","units","postcode","msid","mpan","totalunits"]
 
-#here i'm oppening the csv with the ; separator
-df = pd.read_csv(df_path,sep = ";",parse_dates=['date'])
 
-#I deleted some columns that  are useless for this model
-df = df.drop(columns = ["Column1","units","postcode","msid","mpan","totalunits"] )
+def load_dataframe(df_path=df_path, store_path=store_path):
+    #here i'm converting the csv (with the ; separator) to parquet files by month,
+    #this only happens the first time or when the csv changes
+    manifest = ensure_store(df_path, store_path, 'date', sep=";")
 
+    columns = [c for c in manifest['columns'] if c not in dropped_columns]
 
-
-#Sorting the dataset by dates
-df.sort_values(by=["date"], inplace=True)
+    #Reading the months in order gives the dataset sorted by dates
+    return read_store(store_path, columns).reset_index()[columns]
 
 
 '''
@@ -24,37 +29,38 @@ Here i was making an array that looks like this
 
 [[][]...[]] = x                                    [] = y
           ↑                                          ↑
-This part are the first                    This is the value that the 
+This part are the first                    This is the value that the
 47 values on the dataset                   model are going to predict
 '''
 def x_to_y(df):
-    df_as_np = df.to_numpy()
-    x = []
-    y = []
-
-    for i in (df_as_np):
-        row = [[a] for a in i[2:49]]
-        x.append(row)
-        label = i[49]
-        y.append(label) 
-    
-    return np.array(x), np.array(y)
+    # Slice of the 47 input columns and the label column, straight to a
+    # contiguous float32 array of shape (N, 47, 1) without python lists
+    x = np.ascontiguousarray(df.iloc[:, 2:49].to_numpy(dtype=np.float32))[:, :, np.newaxis]
+    y = df.iloc[:, 49].to_numpy(dtype=np.float32)
+    return x, y
 
 
+def split_bounds(n):
+    return {
+        "train": (0, 133000),
+        "val": (133000, 150000),
+        "test": (150000, n),
+    }
 
-x,y = x_to_y(df)
 
-x_train,y_train = x[:133000], y[:133000]
-x_val,y_val = x[133000:150000], y[133000:150000]
-x_test,y_test = x[150000:], y[150000:]
+def save_splits(df, df_result=df_result):
+    #Each split is converted and saved on its own, so only one of them
+    #is in memory at a time
+    for name, (start, stop) in split_bounds(len(df)).items():
+        x, y = x_to_y(df.iloc[start:stop])
+        print(name, x.shape, " ", y.shape)
+        np.save(os.path.join(df_result, f"x_{name}.npy"), x)
+        np.save(os.path.join(df_result, f"y_{name}.npy"), y)
 
-print(x_train.shape," ",y_train.shape," ",x_val.shape," ",y_val.shape," ",x_test.shape," ",y_test.shape)
 
+def main():
+    save_splits(load_dataframe())
 
 
-np.save(df_result + "x_train.npy", x_train)
-np.save(df_result +"y_train.npy", y_train)
-np.save(df_result + "x_val.npy", x_val)
-np.save(df_result +"y_val.npy", y_val)
-np.save(df_result + "x_test.npy", x_test)
-np.save(df_result +"y_test.npy", y_test)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import numpy as np
+import tensorflow as tf
+
+
+'''
+Pronóstico recursivo del modelo COM: cada predicción se agrega al final de
+la ventana y se descarta el valor más antiguo, durante `steps` pasos.
+
+predict_loop es la versión original (un model.predict por paso).
+compile_rollout traza los 48 pasos como una sola función de TensorFlow,
+llamando al modelo directamente sin el adaptador de datos de predict().
+'''
+
+
+def predict_loop(model, input_seqs, steps=48):
+    input_seqs = np.asarray(input_seqs).reshape(-1, model.input_shape[1], 1)
+    predictions = np.empty((input_seqs.shape[0], steps))
+    for step in range(steps):
+        pred = model.predict(input_seqs, batch_size=input_seqs.shape[0], verbose=0)
+        predictions[:, step] = pred[:, 0]
+        input_seqs = np.concatenate((input_seqs[:, 1:], pred[:, None, :1]), axis=1)
+    return predictions
+
+
+def compile_rollout(model, steps=48):
+    window = model.input_shape[1]
+
+    @tf.function(input_signature=[tf.TensorSpec((None, window, 1), tf.float32)])
+    def rollout(input_seqs):
+        predictions = tf.TensorArray(tf.float32, size=steps)
+        for step in tf.range(steps):
+            pred = model(input_seqs, training=False)
+            predictions = predictions.write(step, pred[:, 0])
+            input_seqs = tf.concat([input_seqs[:, 1:], pred[:, None, :1]], axis=1)
+        return tf.transpose(predictions.stack())
+
+    def run(input_seqs):
+        input_seqs = np.asarray(input_seqs, dtype=np.float32).reshape(-1, window, 1)
+        return rollout(input_seqs).numpy()
+
+    return run
@@ -1,53 +1,126 @@
-import numpy as np
+# Ejecutar desde proyecto_backend: python -m src.GEN.GEN_model
+import os
 import pickle
+import numpy as np
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional
 from tensorflow.keras.callbacks import EarlyStopping
+from .context import SAVED_RESULTS, MODEL_PATH
+from .input_pipeline import npy_dataset, window_dataset
+from .precision import set_training_precision
+
+BATCH_SIZE = 64
+
+
+def load_metadata(saved_results=SAVED_RESULTS):
+    with open(os.path.join(saved_results, 'metadata.pkl'), 'rb') as f:
+        return pickle.load(f)
+
+
+def npy_length(path):
+    """Filas de un .npy leyendo solo su encabezado."""
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, _ = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, _, _ = np.lib.format.read_array_header_2_0(f)
+    return shape[0]
+
+
+def window_splits(metadata, saved_results=SAVED_RESULTS):
+    """
+    (nombre, inicio, fin) de cada división en índices de ventana. Los
+    metadatos anteriores a 'splits' usan los tamaños de X_<nombre>.npy,
+    que son divisiones contiguas de la misma serie.
+    """
+    if 'splits' in metadata:
+        return metadata['splits']
+    splits, start = [], 0
+    for name in ('train', 'val', 'test'):
+        stop = start + npy_length(os.path.join(saved_results, f'X_{name}.npy'))
+        splits.append((name, start, stop))
+        start = stop
+    return splits
+
+
+def load_datasets(metadata, saved_results=SAVED_RESULTS, batch_size=BATCH_SIZE, windows_on_the_fly=False):
+    """
+    Lotes de entrenamiento y validación leídos de los .npy con memory
+    mapping (tf.data con prefetch). Con windows_on_the_fly las ventanas se
+    arman desde la serie escalada en lugar de leer X_*.npy (ocupa
+    window_size veces menos en disco).
+    """
+    def path(name):
+        return os.path.join(saved_results, name)
+
+    if windows_on_the_fly:
+        window_size = metadata['window_size']
+        forecast_horizon = metadata['forecast_horizon']
+        splits = {name: (start, stop) for name, start, stop in window_splits(metadata, saved_results)}
+        train_ds = window_dataset(path('series_X.npy'), path('series_y.npy'),
+                                  window_size, forecast_horizon, *splits['train'],
+                                  batch_size=batch_size, shuffle=True)
+        val_ds = window_dataset(path('series_X.npy'), path('series_y.npy'),
+                                window_size, forecast_horizon, *splits['val'], batch_size=batch_size)
+    else:
+        train_ds = npy_dataset(path('X_train.npy'), path('y_train_reshaped.npy'),
+                               batch_size=batch_size, shuffle=True)
+        val_ds = npy_dataset(path('X_val.npy'), path('y_val_reshaped.npy'),
+                             batch_size=batch_size)
+    return train_ds, val_ds
+
+
+def build_model(window_size, n_features, forecast_horizon, n_targets):
+    # float32, o bfloat16 mixto en CPU con TRAINING_PRECISION=mixed_bfloat16
+    set_training_precision()
+
+    # Crear arquitectura LSTM modificada para manejar el horizonte de predicción mayor
+    model = Sequential()
+    model.add(Bidirectional(LSTM(128, return_sequences=True),
+                              input_shape=(window_size, n_features)))
+    model.add(Dropout(0.3))
+    # Cambiar return_sequences a False para que solo se devuelva el último estado
+    model.add(LSTM(64, return_sequences=False))
+    model.add(Dropout(0.3))
+    model.add(Dense(forecast_horizon * n_targets, dtype='float32'))
+
+    # Compilar el modelo
+    model.compile(optimizer='adam', loss='mse')
+    return model
+
+
+def train(model, train_ds, val_ds, epochs=20, patience=15):
+    # Entrenar el modelo con EarlyStopping
+    early_stop = EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)
+    return model.fit(
+        train_ds,
+        epochs=epochs,
+        validation_data=val_ds,
+        callbacks=[early_stop]
+    )
+
+
+def main(saved_results=SAVED_RESULTS, model_path=MODEL_PATH):
+    metadata = load_metadata(saved_results)
+    window_size = metadata['window_size']
+    forecast_horizon = metadata['forecast_horizon']
+    features_extendidos = metadata['features_extendidos']
+    target_vars = metadata['target_vars']
+
+    train_ds, val_ds = load_datasets(metadata, saved_results,
+                                     windows_on_the_fly=os.environ.get("GEN_WINDOWING") == "on-the-fly")
+    print(f"Datos cargados: {train_ds.cardinality()} lotes de entrenamiento, {val_ds.cardinality()} de validación")
+    print(f"Configuración: ventana {window_size}, horizonte {forecast_horizon}, variables objetivo {len(target_vars)}")
+
+    model = build_model(window_size, len(features_extendidos), forecast_horizon, len(target_vars))
+    model.summary()
+    train(model, train_ds, val_ds)
+
+    # Guardar el modelo entrenado
+    model.save(model_path)
+    print(f"Modelo guardado como '{model_path}'")
+
 
-saved_results = "/models_media/processed_datasets/GEN/"
-
-# Cargar los datos preprocesados utilizando memory mapping
-X_train = np.load(saved_results+'X_train.npy', mmap_mode='r')
-X_val = np.load(saved_results+'X_val.npy', mmap_mode='r')
-y_train_reshaped = np.load(saved_results+'y_train_reshaped.npy', mmap_mode='r')
-y_val_reshaped = np.load(saved_results+'y_val_reshaped.npy', mmap_mode='r')
-
-# Cargar metadatos
-with open(saved_results+'metadata.pkl', 'rb') as f:
-    metadata = pickle.load(f)
-
-window_size = metadata['window_size']
-forecast_horizon = metadata['forecast_horizon']
-features_extendidos = metadata['features_extendidos']
-target_vars = metadata['target_vars']
-
-print(f"Datos cargados: X_train shape {X_train.shape}, y_train shape {y_train_reshaped.shape}")
-print(f"Configuración: ventana {window_size}, horizonte {forecast_horizon}, variables objetivo {len(target_vars)}")
-
-# Crear arquitectura LSTM modificada para manejar el horizonte de predicción mayor
-model = Sequential()
-model.add(Bidirectional(LSTM(128, return_sequences=True), 
-                          input_shape=(window_size, len(features_extendidos))))
-model.add(Dropout(0.3))
-# Cambiar return_sequences a False para que solo se devuelva el último estado
-model.add(LSTM(64, return_sequences=False))
-model.add(Dropout(0.3))
-model.add(Dense(forecast_horizon * len(target_vars)))
-
-# Compilar el modelo
-model.compile(optimizer='adam', loss='mse')
-model.summary()
-
-# Entrenar el modelo con EarlyStopping
-early_stop = EarlyStopping(monitor='val_loss', patience=15, restore_best_weights=True)
-history = model.fit(
-    X_train, y_train_reshaped, 
-    epochs=20, 
-    batch_size=64,
-    validation_data=(X_val, y_val_reshaped), 
-    callbacks=[early_stop]
-)
-
-# Guardar el modelo entrenado
-model.save('weather-1.0.keras')
-print("Modelo guardado como 'weather_lstm_model.h5'")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import json
+import shutil
+import pandas as pd
+
+
+'''
+Almacén columnar de los datasets crudos, particionado por mes.
+
+Cada CSV se convierte una sola vez en archivos Parquet (o Feather) dentro
+de <store>/month=AAAA-MM/, con un manifiesto _store.json que guarda la
+columna de tiempo, las columnas, los meses y la fecha más reciente. Los
+scripts de preprocesamiento y la API leen solo las columnas y los meses
+que necesitan en lugar de volver a parsear el CSV completo.
+
+Requiere pyarrow.
+'''
+
+MANIFEST = '_store.json'
+FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+
+
+def month_key(timestamps):
+    """'AAAA-MM' para cada fecha de una Serie datetime."""
+    return timestamps.dt.year.astype(str) + '-' + timestamps.dt.month.astype(str).str.zfill(2)
+
+
+def _write(df, path, fmt):
+    df = df.reset_index(drop=True)
+    if fmt == 'feather':
+        df.to_feather(path)
+    else:
+        df.to_parquet(path, index=False)
+
+
+def _read(path, fmt, columns):
+    if fmt == 'feather':
+        return pd.read_feather(path, columns=columns)
+    return pd.read_parquet(path, columns=columns)
+
+
+def read_manifest(store_dir):
+    with open(os.path.join(store_dir, MANIFEST)) as f:
+        return json.load(f)
+
+
+def write_store(chunks, store_dir, time_column, fmt='parquet', **metadata):
+    """
+    Escribe bloques de un DataFrame (con `time_column` como columna) en
+    particiones mensuales. Los bloques no tienen que venir ordenados: un
+    mes puede quedar repartido en varios archivos part-NNNNN.
+    Se escribe en un directorio temporal y se reemplaza el almacén al final;
+    `metadata` se agrega tal cual al manifiesto.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    tmp_dir = store_dir.rstrip('/') + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    partitions = {}
+    columns = None
+    latest = None
+    for n, chunk in enumerate(chunks):
+        chunk = chunk.dropna(subset=[time_column])
+        if chunk.empty:
+            continue
+        columns = list(chunk.columns)
+        chunk_max = chunk[time_column].max()
+        latest = chunk_max if latest is None else max(latest, chunk_max)
+
+        for month, part in chunk.groupby(month_key(chunk[time_column]), sort=True):
+            month_dir = os.path.join(tmp_dir, f'month={month}')
+            os.makedirs(month_dir, exist_ok=True)
+            name = f'part-{n:05d}{FORMATS[fmt]}'
+            _write(part, os.path.join(month_dir, name), fmt)
+            partitions.setdefault(month, []).append(name)
+
+    manifest = {
+        'time_column': time_column,
+        'format': fmt,
+        'columns': columns or [],
+        'max_timestamp': latest.isoformat() if latest is not None else None,
+        'partitions': dict(sorted(partitions.items())),
+        **metadata,
+    }
+    with open(os.path.join(tmp_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=4)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    return manifest
+
+
+def convert_csv(csv_path, store_dir, time_column, fmt='parquet', chunksize=100_000, **read_csv_kwargs):
+    """Convierte un CSV por bloques al almacén; las filas sin fecha se descartan."""
+    def chunks():
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, **read_csv_kwargs):
+            chunk[time_column] = pd.to_datetime(chunk[time_column], errors='coerce')
+            yield chunk
+
+    return write_store(chunks(), store_dir, time_column, fmt, source_mtime=os.path.getmtime(csv_path))
+
+
+def ensure_store(csv_path, store_dir, time_column, fmt='parquet', **kwargs):
+    """
+    Convierte el CSV solo si el almacén no existe o el CSV cambió desde la
+    última conversión. Si el CSV no está disponible se usa el almacén tal cual.
+    """
+    try:
+        manifest = read_manifest(store_dir)
+    except FileNotFoundError:
+        manifest = None
+    if not os.path.exists(csv_path):
+        if manifest is None:
+            raise FileNotFoundError(f"No existe {csv_path} ni el almacén {store_dir}")
+        return manifest
+    if manifest is None or manifest.get('source_mtime') != os.path.getmtime(csv_path) \
+            or manifest['format'] != fmt:
+        print(f"Convirtiendo {csv_path} a {fmt} por mes en {store_dir}")
+        manifest = convert_csv(csv_path, store_dir, time_column, fmt, **kwargs)
+    return manifest
+
+
+def max_timestamp(store_dir):
+    """Fecha más reciente del almacén, leída del manifiesto."""
+    latest = read_manifest(store_dir)['max_timestamp']
+    return pd.Timestamp(latest) if latest is not None else None
+
+
+def _read_month(store_dir, manifest, month, columns):
+    time_column, fmt = manifest['time_column'], manifest['format']
+    read_columns = None if columns is None else [time_column] + [c for c in columns if c != time_column]
+    month_dir = os.path.join(store_dir, f'month={month}')
+    df = pd.concat([_read(os.path.join(month_dir, name), fmt, read_columns)
+                    for name in manifest['partitions'][month]], ignore_index=True)
+    return df.set_index(time_column).sort_index()
+
+
+def iter_store(store_dir, columns=None, start=None, end=None):
+    """
+    Genera un DataFrame por mes, indexado y ordenado por la columna de
+    tiempo, con solo `columns`. Solo se abren los meses que se cruzan con
+    [start, end]; las filas fuera del rango se filtran.
+    """
+    manifest = read_manifest(store_dir)
+    first = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+    last = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+
+    for month in manifest['partitions']:
+        if (first is not None and month < first) or (last is not None and month > last):
+            continue
+        df = _read_month(store_dir, manifest, month, columns)
+        if start is not None:
+            df = df[df.index >= start]
+        if end is not None:
+            df = df[df.index <= end]
+        if not df.empty:
+            yield df
+
+
+def read_store(store_dir, columns=None, start=None, end=None):
+    """Lee de una vez las columnas y el rango de fechas pedidos."""
+    parts = list(iter_store(store_dir, columns, start, end))
+    if not parts:
+        manifest = read_manifest(store_dir)
+        return pd.DataFrame(columns=columns or manifest['columns'])
+    return pd.concat(parts)
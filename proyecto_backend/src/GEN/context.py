@@ -0,0 +1,75 @@
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from .historical import build_historical_index
+from .precision import float32_scaler
+
+
+'''
+Artefactos del modelo de clima cargados una sola vez.
+
+Las funciones de pronóstico y evaluación reciben un ForecastContext en
+lugar de leer archivos o variables globales, así se pueden importar sin
+costo (p.ej. desde la API) y cada quien decide de dónde salen el modelo
+y los escaladores.
+'''
+
+SAVED_RESULTS = "models_media/processed_datasets/GEN/"
+MODEL_PATH = "weather-1.0.keras"
+
+
+class ForecastContext:
+    """Modelo, metadatos, escaladores, tabla histórica y últimos datos del modelo de clima."""
+
+    def __init__(self, model, metadata, scaler_X, scaler_y, historical_index, df_last):
+        self.model = model
+        self.metadata = metadata
+        self.scaler_X = scaler_X
+        self.scaler_y = scaler_y
+        self.historical_index = historical_index
+        self.df_last = df_last
+
+    @property
+    def window_size(self):
+        return self.metadata['window_size']
+
+    @property
+    def forecast_horizon(self):
+        return self.metadata['forecast_horizon']
+
+    @property
+    def features_extendidos(self):
+        return self.metadata['features_extendidos']
+
+    @property
+    def target_vars(self):
+        return self.metadata['target_vars']
+
+    @classmethod
+    def load(cls, saved_results=SAVED_RESULTS, model_path=MODEL_PATH, model=None):
+        """Carga los artefactos de creating_dataset y el modelo (si no se pasa uno ya cargado)."""
+        def read_pickle(name):
+            with open(os.path.join(saved_results, name), 'rb') as f:
+                return pickle.load(f)
+
+        if model is None:
+            from tensorflow.keras.models import load_model
+            model = load_model(model_path)
+
+        return cls(
+            model=model,
+            metadata=read_pickle('metadata.pkl'),
+            scaler_X=float32_scaler(read_pickle('scaler_X.pkl')),
+            scaler_y=float32_scaler(read_pickle('scaler_y.pkl')),
+            # Tabla densa con el fallback ya resuelto para el relleno histórico
+            historical_index=build_historical_index(read_pickle('historical_daily_means.pkl')),
+            df_last=pd.read_parquet(os.path.join(saved_results, 'df_last_sample.parquet')),
+        )
+
+
+def load_test_set(saved_results=SAVED_RESULTS):
+    """X_test e y_test en mmap: evaluate_model los recorre por lotes."""
+    X_test = np.load(os.path.join(saved_results, 'X_test.npy'), mmap_mode='r')
+    y_test = np.load(os.path.join(saved_results, 'y_test.npy'), mmap_mode='r')
+    return X_test, y_test
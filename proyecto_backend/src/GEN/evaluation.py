@@ -0,0 +1,95 @@
+import numpy as np
+from .precision import as_model_input
+
+
+'''
+Evaluación del modelo de clima en escala original.
+
+El StandardScaler de salida es una transformación afín por variable,
+así que todas las variables objetivo se desescalan juntas con
+y * scale_ + mean_ (sin matrices con ceros ni un inverse_transform por
+variable). Las métricas se acumulan por lotes como sumas por
+(paso del horizonte, variable), de modo que X_test puede abrirse con
+mmap y nunca se carga completo en memoria.
+'''
+
+
+def inverse_scale(values, scaler):
+    """Desescala un arreglo (..., n_targets) con los parámetros del scaler."""
+    return values * scaler.scale_ + scaler.mean_
+
+
+class MetricsAccumulator:
+    """
+    Sumas suficientes para MAE, RMSE y R² por paso y por variable.
+    Las sumas se llevan en float64 y centradas en la media del primer
+    lote de cada variable, para que la varianza no pierda precisión.
+    """
+
+    def __init__(self, forecast_horizon, n_targets):
+        shape = (forecast_horizon, n_targets)
+        self.count = 0
+        self.shift = None
+        self.abs_error = np.zeros(shape)
+        self.sq_error = np.zeros(shape)
+        self.sum_true = np.zeros(shape)
+        self.sum_true_sq = np.zeros(shape)
+
+    def update(self, y_true, y_pred):
+        """Agrega un lote (batch, horizonte, variables) en escala original."""
+        y_true = np.asarray(y_true, dtype=np.float64)
+        error = np.asarray(y_pred, dtype=np.float64) - y_true
+        if self.shift is None:
+            self.shift = y_true.mean(axis=(0, 1))
+        centered = y_true - self.shift
+
+        self.count += len(y_true)
+        self.abs_error += np.abs(error).sum(axis=0)
+        self.sq_error += np.square(error).sum(axis=0)
+        self.sum_true += centered.sum(axis=0)
+        self.sum_true_sq += np.square(centered).sum(axis=0)
+
+    @staticmethod
+    def _metrics(n, abs_error, sq_error, sum_true, sum_true_sq):
+        total = sum_true_sq - np.square(sum_true) / n
+        # Como r2_score: con y_true constante R² es 1 si el error es nulo y 0 si no
+        constant = total / n <= 1e-12
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r2 = np.where(constant, np.where(sq_error == 0, 1.0, 0.0), 1.0 - sq_error / total)
+        return abs_error / n, np.sqrt(sq_error / n), r2
+
+    def result(self, target_vars):
+        """
+        Devuelve {'per_variable': {var: {'MAE', 'RMSE', 'R²'}},
+                  'per_step': {var: {'MAE': [...], 'RMSE': [...], 'R²': [...]}}}.
+        Las métricas por variable juntan todos los pasos del horizonte.
+        """
+        if not self.count:
+            raise ValueError("No hay datos para evaluar")
+        steps = self.abs_error.shape[0]
+        step_metrics = self._metrics(self.count, self.abs_error, self.sq_error,
+                                     self.sum_true, self.sum_true_sq)
+        var_metrics = self._metrics(self.count * steps, self.abs_error.sum(axis=0),
+                                    self.sq_error.sum(axis=0), self.sum_true.sum(axis=0),
+                                    self.sum_true_sq.sum(axis=0))
+        names = ('MAE', 'RMSE', 'R²')
+        per_variable, per_step = {}, {}
+        for i, var in enumerate(target_vars):
+            per_variable[var] = {name: float(values[i]) for name, values in zip(names, var_metrics)}
+            per_step[var] = {name: values[:, i].tolist() for name, values in zip(names, step_metrics)}
+        return {'per_variable': per_variable, 'per_step': per_step}
+
+
+def evaluate_model(model, X_test, y_test, scaler_y, forecast_horizon, target_vars, batch_size=1024):
+    """
+    MAE, RMSE y R² del modelo sobre (X_test, y_test) escalados, recorriendo
+    X_test por lotes de batch_size ventanas (sirve con arreglos en mmap).
+    """
+    accumulator = MetricsAccumulator(forecast_horizon, len(target_vars))
+    shape = (-1, forecast_horizon, len(target_vars))
+    for start in range(0, len(X_test), batch_size):
+        stop = start + batch_size
+        y_pred = model.predict(as_model_input(X_test[start:stop]), verbose=0).reshape(shape)
+        y_true = np.asarray(y_test[start:stop]).reshape(shape)
+        accumulator.update(inverse_scale(y_true, scaler_y), inverse_scale(y_pred, scaler_y))
+    return accumulator.result(target_vars)
@@ -0,0 +1,134 @@
+import logging
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from .evaluation import inverse_scale
+from .historical import historical_forecast
+from .precision import DTYPE
+from .pv_simulation import simulate_pv_power_with_colab_model
+
+logger = logging.getLogger(__name__)
+
+# Variables de clima que usa la simulación PV
+PV_WEATHER_VARS = ['ghi', 'air_temp', 'wind_speed_10m']
+
+
+# -------------------------
+# Funciones para la predicción
+# -------------------------
+def scaled_window(last_data, scaler_X, metadata):
+    """Última ventana de last_data escalada para el modelo: (1, ventana, features) en float32."""
+    window_size = metadata['window_size']
+    features_extendidos = metadata['features_extendidos']
+
+    if len(last_data) < window_size:
+        raise ValueError(f"Se necesitan al menos {window_size} intervalos de datos recientes")
+
+    input_data = last_data.iloc[-window_size:][features_extendidos].astype(DTYPE)
+    input_scaled = scaler_X.transform(input_data)
+    return input_scaled.reshape(1, window_size, len(features_extendidos))
+
+
+def inverse_forecast(prediction_scaled, scaler_y, metadata):
+    """
+    Salida del modelo (1, horizonte * variables) a un bloque
+    (horizonte, variables) en escala original, desescalado de una sola
+    vez. Sin scaler_y se devuelve en la escala del modelo.
+    """
+    block = np.asarray(prediction_scaled).reshape(metadata['forecast_horizon'], len(metadata['target_vars']))
+    if scaler_y is None:
+        return block
+    return inverse_scale(block, scaler_y)
+
+
+def forecast_timestamps(last_timestamp, steps):
+    """Los `steps` timestamps de 5 minutos siguientes a last_timestamp."""
+    return pd.Timestamp(last_timestamp) + pd.to_timedelta(5 * np.arange(1, steps + 1), unit='min')
+
+
+def next_day_arrays(model, last_data, scaler_X, scaler_y, metadata):
+    """
+    Pronóstico LSTM como arreglos: (timestamps, valores) con valores
+    (horizonte, variables) en float32 y escala original.
+    """
+    prediction_scaled = model.predict(scaled_window(last_data, scaler_X, metadata), verbose=0)
+    values = inverse_forecast(prediction_scaled, scaler_y, metadata)
+    return forecast_timestamps(last_data.index[-1], len(values)), values
+
+
+def predict_next_day(model, last_data, scaler_X, scaler_y, metadata):
+    """
+    Predice las variables climáticas para el próximo día (24 horas)
+    utilizando el modelo LSTM.
+    """
+    timestamps, values = next_day_arrays(model, last_data, scaler_X, scaler_y, metadata)
+    return pd.DataFrame(values, index=timestamps, columns=metadata['target_vars'])
+
+def predict_full_day_hybrid_extended(model, df_sample, scaler_X, scaler_y, metadata, historical_index, total_steps=288):
+    """
+    Genera predicciones para el número total de pasos especificado.
+    Usa LSTM para los primeros 'forecast_horizon' pasos.
+    Usa promedios históricos (tabla de build_historical_index) para el resto.
+
+    Si el LSTM falla la excepción se propaga: un pronóstico hecho solo con
+    históricos no debe publicarse como si fuera del modelo.
+    """
+    window_size = metadata['window_size']
+    target_vars = metadata['target_vars']
+
+    if len(df_sample) < window_size:
+        raise ValueError(f"Se necesitan {window_size} puntos de datos, pero solo hay {len(df_sample)}")
+
+    last_data = df_sample.iloc[-window_size:]
+    lstm_predictions_df = predict_next_day(model, last_data, scaler_X, scaler_y, metadata)
+    if lstm_predictions_df.empty:
+        raise ValueError("La predicción LSTM devolvió un DataFrame vacío")
+    all_predictions = [lstm_predictions_df]
+    last_valid_timestamp = lstm_predictions_df.index[-1]
+
+    remaining_steps = total_steps - len(lstm_predictions_df)
+    if remaining_steps > 0:
+        logger.info("Rellenando %d pasos con datos históricos", remaining_steps)
+        # Empezar desde el último timestamp del LSTM
+        timestamps = forecast_timestamps(last_valid_timestamp, remaining_steps)
+        historical_values, found = historical_forecast(historical_index, timestamps)
+
+        for missing_timestamp in timestamps[~found]:
+            logger.warning("No se encontró promedio histórico para %s. Usando fallback (ceros).", missing_timestamp)
+
+        historical_df = pd.DataFrame(historical_values, index=timestamps, columns=target_vars)
+        historical_df.index.name = 'timestamp'
+        all_predictions.append(historical_df)
+
+    final_predictions_df = pd.concat(all_predictions)
+    
+    final_predictions_df = final_predictions_df.sort_index() 
+    start_prediction_time = last_data.index[-1] + timedelta(minutes=5)
+    end_prediction_time = start_prediction_time + timedelta(minutes=5*(total_steps - 1))
+    
+    final_predictions_df = final_predictions_df[~final_predictions_df.index.duplicated(keep='first')]
+    final_predictions_df = final_predictions_df.loc[start_prediction_time:end_prediction_time]
+    
+    if len(final_predictions_df) > total_steps:
+        final_predictions_df = final_predictions_df.iloc[:total_steps]
+    elif len(final_predictions_df) < total_steps:
+        logger.warning("Se generaron solo %d de %d pasos.", len(final_predictions_df), total_steps)
+
+    return final_predictions_df
+
+
+def forecast_with_solar_power(context, total_steps=288):
+    """
+    Pronóstico híbrido (LSTM + históricos) de total_steps pasos con los
+    artefactos de un ForecastContext, más la generación PV del modelo
+    del Colab en kW (columna 'solarPower'). None si no hay pronóstico.
+    """
+    forecast = predict_full_day_hybrid_extended(
+        context.model, context.df_last, context.scaler_X, context.scaler_y,
+        context.metadata, context.historical_index, total_steps=total_steps,
+    )
+    if forecast is None or forecast.empty:
+        return None
+    forecast = forecast.astype(float)
+    forecast['solarPower'] = simulate_pv_power_with_colab_model(forecast[PV_WEATHER_VARS]) / 1000.0
+    return forecast
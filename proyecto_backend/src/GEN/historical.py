@@ -0,0 +1,119 @@
+import numpy as np
+
+
+# Dimensiones de la tabla de promedios: día de la semana, mes, hora
+N_DAYS, N_MONTHS, N_HOURS = 7, 12, 24
+N_CELLS = N_DAYS * N_MONTHS * N_HOURS
+
+
+class HistoricalAccumulator:
+    """
+    Acumula por bloques las sumas ponderadas de los promedios históricos,
+    así la tabla se puede construir leyendo los datos en streaming.
+    `max_date` es la fecha más reciente de toda la serie, que define el
+    peso de cada fila (decay exponencial, más reciente = más peso).
+    """
+
+    def __init__(self, target_vars, max_date):
+        self.target_vars = list(target_vars)
+        self.max_date = max_date
+        self.weighted_sums = np.zeros((N_CELLS, len(self.target_vars)))
+        self.weight_sums = np.zeros(N_CELLS)
+
+    def add(self, df):
+        # Las filas sin fecha no pertenecen a ningún grupo
+        df = df[df.index.notna()]
+        if df.empty:
+            return
+        index = df.index
+        weight = np.exp(-np.asarray((self.max_date - index).days) / 365)  # Decay exponencial
+        cell = np.asarray((index.dayofweek * N_MONTHS + index.month - 1) * N_HOURS + index.hour, dtype=np.int64)
+
+        # Ordenar por celda para reducir cada grupo contiguo de una sola vez
+        order = np.argsort(cell, kind='stable')
+        cell, weight = cell[order], weight[order]
+        values = df[self.target_vars].to_numpy(dtype=float)[order]
+        starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]])
+
+        self.weighted_sums[cell[starts]] += np.add.reduceat(values * weight[:, None], starts, axis=0)
+        self.weight_sums[cell[starts]] += np.add.reduceat(weight, starts)
+
+    def result(self):
+        """
+        Tabla densa de promedios:
+            'means'    -> (7, 12, 24, n_targets) float32, NaN donde no hay datos
+            'has_data' -> (7, 12, 24) booleano
+            'target_vars'
+        """
+        has_data = self.weight_sums > 0
+        means = np.full(self.weighted_sums.shape, np.nan, dtype=np.float32)
+        means[has_data] = self.weighted_sums[has_data] / self.weight_sums[has_data, None]
+        return {
+            'means': means.reshape(N_DAYS, N_MONTHS, N_HOURS, len(self.target_vars)),
+            'has_data': has_data.reshape(N_DAYS, N_MONTHS, N_HOURS),
+            'target_vars': self.target_vars,
+        }
+
+
+def historical_lookup(historical, day_of_week, month, hour):
+    """
+    Promedio histórico para (día de la semana 0-6, mes 1-12, hora 0-23)
+    como {variable: valor}, o None si no hubo datos para esa combinación.
+    Lectura de una celda de la tabla densa; para muchos timestamps usar
+    historical_forecast.
+    """
+    if not historical['has_data'][day_of_week, month - 1, hour]:
+        return None
+    values = historical['means'][day_of_week, month - 1, hour]
+    return dict(zip(historical['target_vars'], values.tolist()))
+
+
+def build_historical_index(historical):
+    """
+    Resuelve de antemano el fallback de la tabla: las celdas sin datos
+    toman el valor del primer mes con datos para el mismo día de la semana
+    y hora. Devuelve una tabla con la misma estructura, donde 'has_data'
+    indica si la celda quedó resuelta; las que no, quedan en cero.
+    """
+    means, has_data = historical['means'], historical['has_data']
+    first_month = np.argmax(has_data, axis=1)  # (7, 24)
+    fallback = np.take_along_axis(means, first_month[:, None, :, None], axis=1)
+
+    resolved = has_data | has_data.any(axis=1, keepdims=True)
+    values = np.where(has_data[..., None], means, fallback)
+    values[~resolved] = 0.0
+
+    return {
+        'means': values,
+        'has_data': resolved,
+        'target_vars': list(historical['target_vars']),
+    }
+
+
+def historical_forecast(historical_index, timestamps):
+    """
+    Pronóstico histórico para todo un DatetimeIndex con una sola lectura
+    vectorizada de la tabla: interpola entre el promedio de la hora actual
+    y el de la siguiente según el minuto. Si la hora siguiente no tiene
+    datos se usa la actual; si la actual no tiene, el valor es cero.
+
+    Devuelve (valores (n, n_targets), máscara de filas con datos (n,)).
+    """
+    means, has_data = historical_index['means'], historical_index['has_data']
+    next_hour = timestamps + np.timedelta64(1, 'h')
+
+    curr = (np.asarray(timestamps.dayofweek, dtype=np.int64),
+            np.asarray(timestamps.month, dtype=np.int64) - 1,
+            np.asarray(timestamps.hour, dtype=np.int64))
+    nxt = (np.asarray(next_hour.dayofweek, dtype=np.int64),
+           np.asarray(next_hour.month, dtype=np.int64) - 1,
+           np.asarray(next_hour.hour, dtype=np.int64))
+
+    found = has_data[curr]
+    val_curr = means[curr]
+    val_next = np.where(has_data[nxt][:, None], means[nxt], val_curr)
+    minute_fraction = np.asarray(timestamps.minute, dtype=float)[:, None] / 60.0
+
+    values = val_curr + (val_next - val_curr) * minute_fraction
+    values[~found] = 0.0
+    return values, found
@@ -0,0 +1,52 @@
+import numpy as np
+from .columnar import ensure_store, iter_store
+
+
+'''
+Lectura del dataset de clima de la estación.
+
+El CSV se convierte una sola vez al almacén columnar por mes (ver
+columnar.py) con tipos compactos (float32 para las variables, categórico
+para `period`). Después los bloques se leen mes a mes y solo con las
+columnas pedidas, así la memoria máxima no depende del largo de la
+historia.
+'''
+
+CHUNKSIZE = 100_000
+
+# Características temporales cíclicas que se agregan a cada bloque
+TIME_FEATURES = ['hour_sin', 'hour_cos', 'day_sin', 'day_cos']
+
+
+def csv_dtypes(features):
+    dtypes = {feature: 'float32' for feature in features}
+    dtypes['period'] = 'category'
+    return dtypes
+
+
+def add_time_features(df):
+    """Añade hora, minuto, día del año y su representación cíclica."""
+    df['hour'] = df.index.hour
+    df['minute'] = df.index.minute
+    df['dayofyear'] = df.index.dayofyear
+
+    df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24).astype(np.float32)
+    df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24).astype(np.float32)
+    df['day_sin'] = np.sin(2 * np.pi * df['dayofyear'] / 365).astype(np.float32)
+    df['day_cos'] = np.cos(2 * np.pi * df['dayofyear'] / 365).astype(np.float32)
+    return df
+
+
+def weather_store(csv_path, store_dir, features, chunksize=CHUNKSIZE):
+    """Convierte el CSV al almacén por mes si aún no existe o cambió."""
+    return ensure_store(csv_path, store_dir, 'period_end',
+                        chunksize=chunksize, dtype=csv_dtypes(features))
+
+
+def read_weather_chunks(store_dir, columns, start=None, end=None):
+    """
+    Genera un bloque por mes indexado por period_end, solo con `columns`
+    y las características temporales ya calculadas.
+    """
+    for chunk in iter_store(store_dir, columns, start, end):
+        yield add_time_features(chunk)
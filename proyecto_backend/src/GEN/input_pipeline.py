@@ -0,0 +1,109 @@
+import numpy as np
+import tensorflow as tf
+
+
+'''
+Entrada de entrenamiento con tf.data sobre archivos .npy en memory mapping.
+
+Los arreglos nunca se cargan completos: cada lote se arma leyendo del
+memmap solo las filas que lo componen, en paralelo (num_parallel_calls)
+y con prefetch, así el entrenamiento en CPU queda limitado por el
+cómputo y no por la memoria. Lo usan COM_model.py y GEN_model.py.
+'''
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+class ShardedArray:
+    """
+    Vista de solo lectura sobre uno o varios .npy (shards) concatenados
+    en el primer eje, abiertos con mmap_mode='r'.
+    """
+
+    def __init__(self, paths):
+        if isinstance(paths, str):
+            paths = [paths]
+        self.shards = [np.load(path, mmap_mode='r') for path in paths]
+        self.offsets = np.cumsum([0] + [len(shard) for shard in self.shards])
+        self.shape = (int(self.offsets[-1]),) + self.shards[0].shape[1:]
+        self.dtype = self.shards[0].dtype
+
+    def __len__(self):
+        return self.shape[0]
+
+    def take(self, indices):
+        """Filas `indices` copiadas a un arreglo en memoria."""
+        if len(self.shards) == 1:
+            return np.asarray(self.shards[0][indices])
+        shard_of = np.searchsorted(self.offsets, indices, side='right') - 1
+        out = np.empty((len(indices),) + self.shape[1:], dtype=self.dtype)
+        for s in np.unique(shard_of):
+            mask = shard_of == s
+            out[mask] = self.shards[s][indices[mask] - self.offsets[s]]
+        return out
+
+
+def _batches(n, batch_size, shuffle, seed):
+    """Índices de cada lote; con shuffle se reordenan en cada época."""
+    indices = tf.data.Dataset.range(n)
+    if shuffle:
+        indices = indices.shuffle(n, seed=seed, reshuffle_each_iteration=True)
+    # Ordenar dentro del lote para leer el memmap de forma más secuencial
+    return indices.batch(batch_size).map(tf.sort, num_parallel_calls=AUTOTUNE)
+
+
+def npy_dataset(x_paths, y_paths, batch_size=32, shuffle=False, seed=None, dtype=np.float32):
+    """
+    tf.data.Dataset de lotes (x, y) leídos de .npy con memory mapping.
+    `x_paths` / `y_paths` pueden ser una ruta o una lista de shards.
+    """
+    x, y = ShardedArray(x_paths), ShardedArray(y_paths)
+    if len(x) != len(y):
+        raise ValueError(f"x e y tienen distinto número de filas: {len(x)} != {len(y)}")
+
+    def load(indices):
+        return x.take(indices).astype(dtype, copy=False), y.take(indices).astype(dtype, copy=False)
+
+    def load_batch(indices):
+        xb, yb = tf.numpy_function(load, [indices], (tf.as_dtype(dtype), tf.as_dtype(dtype)))
+        xb.set_shape((None,) + x.shape[1:])
+        yb.set_shape((None,) + y.shape[1:])
+        return xb, yb
+
+    return (_batches(len(x), batch_size, shuffle, seed)
+            .map(load_batch, num_parallel_calls=AUTOTUNE, deterministic=not shuffle)
+            .prefetch(AUTOTUNE))
+
+
+def window_dataset(series_x_path, series_y_path, window_size, forecast_horizon, start=0, stop=None,
+                   batch_size=64, shuffle=False, seed=None, dtype=np.float32):
+    """
+    Igual que npy_dataset pero arma las ventanas al vuelo desde la serie
+    (sin las copias desplazadas de X_*.npy):
+        x[i] = serie_x[i : i+window_size]
+        y[i] = serie_y[i+window_size : i+window_size+forecast_horizon] aplanado
+    para las ventanas i en [start, stop).
+    """
+    series_x, series_y = ShardedArray(series_x_path), ShardedArray(series_y_path)
+    n_windows = len(series_x) - window_size - forecast_horizon + 1
+    stop = n_windows if stop is None else min(stop, n_windows)
+    x_offsets = np.arange(window_size)
+    y_offsets = window_size + np.arange(forecast_horizon)
+    n_targets = series_y.shape[1]
+
+    def load(indices):
+        starts = indices + start
+        xb = series_x.take((starts[:, None] + x_offsets).ravel())
+        yb = series_y.take((starts[:, None] + y_offsets).ravel())
+        return (xb.reshape(len(starts), window_size, -1).astype(dtype, copy=False),
+                yb.reshape(len(starts), -1).astype(dtype, copy=False))
+
+    def load_batch(indices):
+        xb, yb = tf.numpy_function(load, [indices], (tf.as_dtype(dtype), tf.as_dtype(dtype)))
+        xb.set_shape((None, window_size) + series_x.shape[1:])
+        yb.set_shape((None, forecast_horizon * n_targets))
+        return xb, yb
+
+    return (_batches(max(stop - start, 0), batch_size, shuffle, seed)
+            .map(load_batch, num_parallel_calls=AUTOTUNE, deterministic=not shuffle)
+            .prefetch(AUTOTUNE))
@@ -0,0 +1,44 @@
+import os
+import numpy as np
+
+
+'''
+Contrato de tipos de datos del camino de inferencia.
+
+Los modelos trabajan en float32, así que los datasets guardados, los
+escaladores y las entradas de los endpoints también usan float32: no
+hay conversiones en cada llamada y la memoria y el ancho de banda se
+reducen a la mitad frente a float64.
+
+Para entrenar en CPU se puede usar precisión mixta bfloat16 con
+TRAINING_PRECISION=mixed_bfloat16 (las salidas de los modelos siguen
+siendo float32).
+'''
+
+DTYPE = np.float32
+
+
+def as_model_input(values):
+    """Convierte la entrada de un modelo a float32 (sin copiar si ya lo es)."""
+    return np.asarray(values, dtype=DTYPE)
+
+
+def float32_scaler(scaler):
+    """
+    Pasa mean_, scale_ y var_ de un StandardScaler a float32, así
+    transform/inverse_transform sobre datos float32 no suben a float64.
+    """
+    for attr in ('mean_', 'scale_', 'var_'):
+        value = getattr(scaler, attr, None)
+        if value is not None:
+            setattr(scaler, attr, np.asarray(value, dtype=DTYPE))
+    return scaler
+
+
+def set_training_precision():
+    """Aplica la política de Keras de TRAINING_PRECISION (por defecto float32)."""
+    policy = os.environ.get("TRAINING_PRECISION", "float32")
+    if policy != "float32":
+        from tensorflow.keras import mixed_precision
+        mixed_precision.set_global_policy(policy)
+    return policy
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# Parámetros del Panel PV y Térmicos (del código Colab del jefe)
+# -------------------------
+A = 1.6              # Panel area in m²
+absorptivity = 0.9   # Fraction of solar irradiance absorbed
+h0 = 10              # Base heat transfer coefficient (W/m²·°C)
+k = 5                # Wind speed coefficient (W/m²·°C per m/s)
+C = 5000             # Thermal capacity (J/°C)
+T_ref = 25           # Reference temperature (°C)
+
+# PV electrical parameters at STC
+eta = 0.15           # Nominal efficiency
+alpha = -0.004       # Temperature coefficient for efficiency (per °C)
+FF = 0.75            # Fill factor
+V_oc_ref = 40.0      # Open-circuit voltage at STC (V)
+R_int = 0.05         # Effective internal resistance (Ohm)
+beta = -0.2          # Voltage temperature coefficient (V/°C)
+
+DEFAULT_DT = 300     # Paso por defecto (s) cuando el índice no avanza
+
+
+# -------------------------
+# Funciones de Simulación del Panel PV (adaptadas del Colab)
+# Todas operan sobre arreglos de NumPy con broadcasting: A, eta y alpha
+# pueden ser escalares o un valor por panel/escenario.
+# -------------------------
+def dT_dt_model_colab(T, G, T_amb, wind_speed, A=A, eta=eta, alpha=alpha):
+    """
+    Compute the rate of change of panel temperature (lógica del Colab).
+    """
+    Q_in = G * A * absorptivity
+    eta_adj = eta * np.maximum(1 + alpha * (T - T_ref), 0)
+    P_electrical_potential = G * A * eta_adj # Potencial eléctrico, no necesariamente el P_values final de la simulación
+
+    V_oc = V_oc_ref + beta * (T - T_ref)
+    V_mpp = FF * V_oc
+    I_mpp = np.divide(P_electrical_potential, V_mpp,
+                      out=np.zeros(np.broadcast(P_electrical_potential, V_mpp).shape), where=V_mpp > 0)
+
+    Q_self = I_mpp**2 * R_int
+    h = h0 + k * wind_speed
+    Q_out = h * A * (T - T_amb)
+
+    return (Q_in + Q_self - Q_out) / C
+
+
+def rk4_step_colab(T_prev, dt, G_prev, T_amb_prev, wind_speed_prev, A=A, eta=eta, alpha=alpha):
+    """
+    Realiza un paso de integración RK4 (lógica del Colab).
+    Asumimos que G, T_amb y wind_speed no cambian significativamente en el sub-paso dt.
+    """
+    k1 = dT_dt_model_colab(T_prev, G_prev, T_amb_prev, wind_speed_prev, A, eta, alpha)
+    k2 = dT_dt_model_colab(T_prev + 0.5 * dt * k1, G_prev, T_amb_prev, wind_speed_prev, A, eta, alpha)
+    k3 = dT_dt_model_colab(T_prev + 0.5 * dt * k2, G_prev, T_amb_prev, wind_speed_prev, A, eta, alpha)
+    k4 = dT_dt_model_colab(T_prev + dt * k3, G_prev, T_amb_prev, wind_speed_prev, A, eta, alpha)
+    return T_prev + (dt / 6) * (k1 + 2*k2 + 2*k3 + k4)
+
+
+def simulate_pv_power(ghi, air_temp, wind_speed, dt, A=A, eta=eta, alpha=alpha):
+    """
+    Simula la temperatura y la potencia (W) de muchos paneles a la vez.
+
+    ghi, air_temp, wind_speed: (n_steps,) o (n_steps, ...) si cada
+    escenario tiene su propio clima. dt: (n_steps - 1,) segundos entre pasos.
+    A, eta, alpha: escalares o arreglos, p.ej. (n_panels,).
+
+    La recursión en el tiempo es un ciclo de n_steps; cada paso avanza
+    todos los paneles con operaciones vectorizadas.
+    Devuelve (P, T_panel), ambos de forma (n_steps, *forma_de_los_paneles).
+    """
+    G = np.asarray(ghi, dtype=float)
+    T_amb = np.asarray(air_temp, dtype=float)
+    wind = np.asarray(wind_speed, dtype=float)
+    dt = np.asarray(dt, dtype=float)
+    A, eta, alpha = np.asarray(A, dtype=float), np.asarray(eta, dtype=float), np.asarray(alpha, dtype=float)
+
+    n_steps = G.shape[0]
+    panel_shape = np.broadcast_shapes(G.shape[1:], T_amb.shape[1:], wind.shape[1:],
+                                      A.shape, eta.shape, alpha.shape)
+    shape = (n_steps,) + panel_shape
+    if n_steps == 0:
+        return np.zeros(shape), np.zeros(shape)
+
+    # Alinear el clima con la forma de los paneles para el broadcasting
+    G, T_amb, wind = (x.reshape(x.shape + (1,) * (len(shape) - x.ndim)) for x in (G, T_amb, wind))
+
+    T_panel = np.empty(shape)
+    T_panel[0] = T_amb[0]
+    for i in range(1, n_steps):
+        T_panel[i] = rk4_step_colab(T_panel[i-1], dt[i-1], G[i-1], T_amb[i-1], wind[i-1], A, eta, alpha)
+
+    eta_adj = eta * np.maximum(1 + alpha * (T_panel - T_ref), 0)
+    P_output = np.maximum(G * A * eta_adj, 0)
+    return P_output, T_panel
+
+
+def step_seconds(index):
+    """
+    Segundos entre pasos consecutivos de un DatetimeIndex, (n_steps - 1,).
+    Los pasos no positivos se reemplazan por DEFAULT_DT.
+    """
+    dt = np.asarray((index[1:] - index[:-1]).total_seconds(), dtype=float)
+    for i in np.flatnonzero(dt <= 0):
+        print(f"Advertencia: dt_val no positivo ({dt[i]}s) en el índice {i + 1}. Usando dt={DEFAULT_DT}s por defecto.")
+    dt[dt <= 0] = DEFAULT_DT
+    return dt
+
+
+def simulate_pv_power_with_colab_model(predicted_weather_df, A=A, eta=eta, alpha=alpha):
+    if not all(col in predicted_weather_df.columns for col in ['ghi', 'air_temp', 'wind_speed_10m']):
+        raise ValueError("El DataFrame de entrada debe contener 'ghi', 'air_temp', 'wind_speed_10m'")
+    if not isinstance(predicted_weather_df.index, pd.DatetimeIndex):
+        raise ValueError("El DataFrame de entrada debe tener un DatetimeIndex.")
+
+    index = predicted_weather_df.index
+    if len(index) == 0:
+        return pd.Series(dtype=float)
+
+    dt = step_seconds(index)
+    P_output, _ = simulate_pv_power(
+        predicted_weather_df['ghi'].to_numpy(dtype=float),
+        predicted_weather_df['air_temp'].to_numpy(dtype=float),
+        predicted_weather_df['wind_speed_10m'].to_numpy(dtype=float),
+        dt, A, eta, alpha,
+    )
+    if P_output.ndim == 1:
+        return pd.Series(P_output, index=index)
+    return pd.DataFrame(P_output.reshape(len(index), -1), index=index)
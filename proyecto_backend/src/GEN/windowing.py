@@ -0,0 +1,83 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def create_sequences(data, target_data, window_size=72, forecast_horizon=4):
+    """
+    Crea las secuencias para el LSTM como vistas deslizantes sobre los
+    datos, sin copiar cada ventana:
+        X[i] = data[i : i+window_size]
+        y[i] = target_data[i+window_size : i+window_size+forecast_horizon]
+    """
+    data = np.asarray(data)
+    target_data = np.asarray(target_data)
+    n = len(data) - window_size - forecast_horizon + 1
+    if n <= 0:
+        return (np.empty((0, window_size, data.shape[1]), dtype=data.dtype),
+                np.empty((0, forecast_horizon, target_data.shape[1]), dtype=target_data.dtype))
+
+    X = sliding_window_view(data, window_size, axis=0)[:n].transpose(0, 2, 1)
+    y = sliding_window_view(target_data[window_size:], forecast_horizon, axis=0)[:n].transpose(0, 2, 1)
+    return X, y
+
+
+class WindowSplitWriter:
+    """
+    Escribe las ventanas de una serie que llega por bloques directamente
+    en los .npy de cada división (memmaps), sin tener la serie completa en
+    memoria. Entre bloques solo conserva las filas que aún no completan
+    una ventana (window_size + forecast_horizon - 1 como máximo).
+
+    `splits` es una lista de (nombre, inicio, fin) en índices de ventana.
+    Por cada división se escriben X_<nombre>.npy y y_<nombre>_reshaped.npy;
+    para 'test' también y_test.npy con forma (n, horizonte, targets).
+    """
+
+    def __init__(self, save_results, splits, window_size, forecast_horizon,
+                 n_features, n_targets, dtype=np.float32):
+        self.splits = splits
+        self.window_size = window_size
+        self.forecast_horizon = forecast_horizon
+        self.written = 0
+        self._carry_X = np.empty((0, n_features), dtype=dtype)
+        self._carry_y = np.empty((0, n_targets), dtype=dtype)
+
+        def open_npy(name, shape):
+            return np.lib.format.open_memmap(save_results + name, mode='w+', dtype=dtype, shape=shape)
+
+        self._outputs = {}
+        for name, start, stop in splits:
+            n = stop - start
+            self._outputs[name] = {
+                'X': open_npy(f'X_{name}.npy', (n, window_size, n_features)),
+                'y_reshaped': open_npy(f'y_{name}_reshaped.npy', (n, forecast_horizon * n_targets)),
+                'y': open_npy('y_test.npy', (n, forecast_horizon, n_targets)) if name == 'test' else None,
+            }
+
+    def add(self, X_block, y_block):
+        data = np.concatenate([self._carry_X, np.asarray(X_block, dtype=self._carry_X.dtype)])
+        target = np.concatenate([self._carry_y, np.asarray(y_block, dtype=self._carry_y.dtype)])
+        X, y = create_sequences(data, target, self.window_size, self.forecast_horizon)
+
+        first, last = self.written, self.written + len(X)
+        for name, start, stop in self.splits:
+            lo, hi = max(first, start), min(last, stop)
+            if lo >= hi:
+                continue
+            outputs = self._outputs[name]
+            y_part = y[lo - first:hi - first]
+            outputs['X'][lo - start:hi - start] = X[lo - first:hi - first]
+            outputs['y_reshaped'][lo - start:hi - start] = y_part.reshape(len(y_part), -1)
+            if outputs['y'] is not None:
+                outputs['y'][lo - start:hi - start] = y_part
+
+        self.written = last
+        self._carry_X = data[len(X):].copy()
+        self._carry_y = target[len(X):].copy()
+
+    def close(self):
+        for outputs in self._outputs.values():
+            for out in outputs.values():
+                if out is not None:
+                    out.flush()
+        self._outputs = {}
@@ -1,3 +1,4 @@
+import os
 from flask import Flask
 from . import modules
 from flask_cors import CORS
@@ -7,5 +8,37 @@ def create_app():
     app = Flask(__name__)
     CORS(app)
     app.register_blueprint(modules.bp)
+
+    # Almacén de pronósticos publicados, scheduler y registro de hogares
+    # (crean FORECAST_DIR y su base SQLite, por eso no al importar)
+    modules.init_forecasts()
+
+    # MODEL_LOADING=eager carga los modelos aquí mismo; con gunicorn eso
+    # ocurre antes del fork y los workers los comparten (solo con TFLite,
+    # TensorFlow se bloquea en un proceso hijo)
+    prefork = os.environ.get("SERVER_MODE") == "prefork"
+    if os.environ.get("MODEL_LOADING") == "eager":
+        if prefork and modules.MODEL_BACKEND != "tflite":
+            raise RuntimeError("MODEL_LOADING=eager con gunicorn requiere MODEL_BACKEND=tflite")
+        modules.MODELS.load_all()
+
+    # Los hilos no sobreviven al fork: con gunicorn (SERVER_MODE=prefork)
+    # se inician en cada worker desde post_fork (gunicorn.conf.py)
+    if not prefork:
+        start_background()
+
     return app
 
+
+def start_background():
+    # Los modelos se cargan en segundo plano salvo MODEL_LOADING=lazy,
+    # en cuyo caso cada uno se carga en su primera petición
+    if os.environ.get("MODEL_LOADING", "background") != "lazy":
+        modules.MODELS.start()
+
+    # Pronósticos recalculados cada FORECAST_REFRESH_SECONDS (FORECAST_SCHEDULER=off lo desactiva);
+    # con varios workers solo uno calcula y todos leen lo publicado en FORECAST_DIR
+    if modules.FORECAST_SCHEDULER:
+        modules.init_forecasts()
+        modules.SCHEDULER.start()
+
@@ -0,0 +1,78 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+
+
+class ArtifactRegistry:
+    """
+    Mantiene en memoria los artefactos de preprocesamiento (scalers,
+    metadata, muestras) de un directorio. Cada archivo se lee y
+    deserializa una sola vez; solo se vuelve a cargar cuando cambia su
+    mtime y además su contenido (hash sha256) es distinto.
+
+    Para que el camino de la petición no toque el disco, el mtime se
+    revisa como máximo una vez cada `check_interval` segundos.
+    """
+
+    def __init__(self, base_dir, check_interval=5.0):
+        self.base_dir = base_dir
+        self.check_interval = check_interval
+        self._entries = {}
+        self._missing = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, loader=pickle.loads, optional=False):
+        """
+        Devuelve el artefacto `name` ya deserializado con `loader`, que
+        recibe los bytes del archivo. Si `optional` es True y el archivo
+        no existe devuelve None en lugar de lanzar FileNotFoundError.
+        """
+        entry = self._entries.get(name)
+        if entry is not None and time.monotonic() - entry['checked'] < self.check_interval:
+            return entry['value']
+
+        # Un archivo opcional ausente también se revisa una vez por intervalo
+        missing = self._missing.get(name)
+        if optional and missing is not None and time.monotonic() - missing < self.check_interval:
+            return None
+
+        with self._lock:
+            try:
+                entry = self._refresh(name, loader)
+            except FileNotFoundError:
+                self._entries.pop(name, None)
+                self._missing[name] = time.monotonic()
+                if optional:
+                    return None
+                raise
+        self._missing.pop(name, None)
+        return entry['value']
+
+    def _refresh(self, name, loader):
+        path = os.path.join(self.base_dir, name)
+        entry = self._entries.get(name)
+        mtime = os.stat(path).st_mtime_ns
+
+        if entry is None or entry['mtime'] != mtime:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if entry is None or entry['digest'] != digest:
+                entry = {'value': loader(raw), 'digest': digest}
+            entry['mtime'] = mtime
+
+        entry['checked'] = time.monotonic()
+        self._entries[name] = entry
+        return entry
+
+    def digest(self, name):
+        """Hash sha256 del contenido cargado actualmente para `name`."""
+        entry = self._entries.get(name)
+        return entry['digest'] if entry is not None else None
+
+    def mtime(self, name):
+        """mtime (ns) del archivo cargado actualmente para `name`."""
+        entry = self._entries.get(name)
+        return entry['mtime'] if entry is not None else None
@@ -0,0 +1,118 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+from .executor import QueueFull
+
+
+class MicroBatcher:
+    """
+    Agrupa peticiones concurrentes en una sola llamada al modelo.
+
+    La primera petición que llega abre una ventana de `window` segundos;
+    las que llegan dentro de ella se juntan (hasta `max_batch` filas) y
+    se ejecutan como un solo lote con `fn`. Cada petición recibe de vuelta
+    solo sus filas del resultado. Un hilo propio ejecuta los lotes, así
+    `fn` nunca se llama desde dos hilos a la vez.
+
+    submit() no bloquea: devuelve un Future y quien lo espera decide cómo
+    (p.ej. una vista async con InferenceExecutor.wait, sin ocupar un lugar
+    del pool de inferencia; su hilo del servidor sí queda esperando).
+    Como máximo se aceptan `max_pending` filas sin resolver; por encima,
+    submit lanza QueueFull.
+    """
+
+    def __init__(self, fn, window=0.005, max_batch=256, max_pending=1024):
+        self.fn = fn
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = 0
+        self._rejected = 0
+        self._batches = 0
+        self._requests = 0
+        self._rows = 0
+
+    def submit(self, rows):
+        """Encola `rows` (n, ...); el Future se resuelve con sus n resultados."""
+        rows = np.asarray(rows)
+        with self._lock:
+            if self._pending + len(rows) > self.max_pending:
+                self._rejected += 1
+                raise QueueFull(f"Cola de micro-batching llena ({self.max_pending} filas)")
+            self._pending += len(rows)
+        self._ensure_thread()
+        future = Future()
+        future.add_done_callback(lambda _: self._release(len(rows)))
+        self._queue.put((rows, future))
+        return future
+
+    def _release(self, n):
+        with self._lock:
+            self._pending -= n
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self, first):
+        """Junta las peticiones que llegan durante la ventana, sin pasar de max_batch filas."""
+        items, rows = [first], len(first[0])
+        deadline = time.perf_counter() + self.window
+        carry = None
+        while rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if rows + len(item[0]) > self.max_batch:
+                carry = item
+                break
+            items.append(item)
+            rows += len(item[0])
+        return items, carry
+
+    def _run(self):
+        carry = None
+        while True:
+            first = carry if carry is not None else self._queue.get()
+            items, carry = self._collect(first)
+            # Las peticiones canceladas (p.ej. por timeout) no entran al lote
+            items = [item for item in items if item[1].set_running_or_notify_cancel()]
+            if not items:
+                continue
+            try:
+                results = self.fn(np.concatenate([rows for rows, _ in items]))
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for rows, future in items:
+                future.set_result(results[start:start + len(rows)])
+                start += len(rows)
+            self._batches += 1
+            self._requests += len(items)
+            self._rows += start
+
+    def stats(self):
+        return {
+            'window_ms': self.window * 1000,
+            'max_batch': self.max_batch,
+            'max_pending': self.max_pending,
+            'pending_rows': self._pending,
+            'rejected': self._rejected,
+            'batches': self._batches,
+            'requests': self._requests,
+            'mean_batch_rows': round(self._rows / self._batches, 2) if self._batches else 0.0,
+        }
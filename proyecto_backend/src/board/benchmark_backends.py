@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import numpy as np
+from tensorflow.keras.models import load_model
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from COM.rollout import compile_rollout
+from board.tflite_backend import load_tflite_model, tflite_rollout
+
+
+'''
+Compara la latencia en CPU de los backends de la API: Keras/TensorFlow
+contra los modelos TFLite cuantizados de export_tflite.py.
+Se ejecuta desde proyecto_backend: python src/board/benchmark_backends.py
+'''
+
+weather_model_name = "weather-1.0.keras"
+com_model_name = os.environ.get("COM_MODEL", "COM-3.0.keras")
+quantizations = ["float16", "int8"]
+com_batch_sizes = [1, 32]
+repeats = 5
+
+rng = np.random.default_rng(0)
+
+
+def best_time(fn, x):
+    fn(x)  # calentamiento
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(x)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def timed_load(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+weather_keras, weather_load = timed_load(lambda: load_model(weather_model_name))
+com_keras, com_load = timed_load(lambda: compile_rollout(load_model(com_model_name)))
+backends = {'keras': (weather_keras, com_keras, weather_load + com_load)}
+for quantization in quantizations:
+    weather, weather_load = timed_load(lambda: load_tflite_model(weather_model_name, quantization))
+    com, com_load = timed_load(lambda: tflite_rollout(load_tflite_model(com_model_name, quantization)))
+    backends[f'tflite-{quantization}'] = (weather, com, weather_load + com_load)
+
+x_weather = rng.standard_normal((1,) + weather_keras.input_shape[1:]).astype(np.float32)
+x_com = {n: (rng.random((n, 47, 1)) / 3).astype(np.float32) for n in com_batch_sizes}
+reference_weather = weather_keras.predict(x_weather, verbose=0)
+reference_com = {n: com_keras(x) for n, x in x_com.items()}
+
+print("|backend|carga (s)|clima N=1 (ms)|" + "|".join(f"COM 48 pasos N={n} (ms)" for n in com_batch_sizes)
+      + "|max |diff| clima|max |diff| COM|")
+print("---------------------------")
+for name, (weather, com, load_time) in backends.items():
+    t_weather = best_time(lambda x: weather.predict(x, verbose=0), x_weather)
+    t_com = [best_time(com, x_com[n]) for n in com_batch_sizes]
+    diff_weather = np.max(np.abs(weather.predict(x_weather, verbose=0) - reference_weather))
+    diff_com = max(np.max(np.abs(com(x) - reference_com[n])) for n, x in x_com.items())
+    print(f"| {name} | {load_time:.2f} | {t_weather * 1000:.1f} | "
+          + " | ".join(f"{t * 1000:.1f}" for t in t_com)
+          + f" | {diff_weather:.2e} | {diff_com:.2e} |")
@@ -0,0 +1,66 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def fingerprint(array, version):
+    """
+    Huella de una ventana de entrada: sha256 de sus bytes, forma y tipo,
+    junto con la versión del modelo que la va a consumir.
+    """
+    array = np.ascontiguousarray(array)
+    h = hashlib.sha256()
+    h.update(version.encode())
+    h.update(str(array.shape).encode())
+    h.update(array.dtype.str.encode())
+    h.update(array.tobytes())
+    return h.hexdigest()
+
+
+class ForecastCache:
+    """
+    Cache LRU con expiración (TTL) para resultados de pronósticos.
+    Al superar `maxsize` se descarta la entrada usada hace más tiempo.
+    """
+
+    def __init__(self, maxsize=32, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or time.monotonic() - item[0] > self.ttl:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+            }
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """No queda espacio en la cola de inferencia."""
+
+
+class InferenceExecutor:
+    """
+    Pool de hilos acotado para la inferencia de las rutas /predict.
+
+    Admite como máximo `workers` trabajos en ejecución más `queue_size`
+    en espera; si no hay espacio, submit lanza QueueFull en lugar de
+    encolar sin límite. run() espera el resultado como máximo `timeout`
+    segundos: al vencer, el trabajo que aún no empezó se cancela y el
+    que ya corre termina en segundo plano ocupando su lugar hasta el final.
+
+    Son hilos y no procesos: los modelos no se pueden serializar entre
+    procesos y TensorFlow / TFLite liberan el GIL mientras calculan.
+    """
+
+    def __init__(self, workers=4, queue_size=16, timeout=30.0):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._timeouts = 0
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise QueueFull(f"Cola de inferencia llena ({self.workers + self.queue_size} trabajos)")
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending += 1
+            self._submitted += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    async def run(self, fn, *args, **kwargs):
+        """Ejecuta fn en el pool; lanza QueueFull o asyncio.TimeoutError."""
+        return await self.wait(self.submit(fn, *args, **kwargs))
+
+    async def wait(self, future):
+        """
+        Espera un concurrent.futures.Future (del pool o de otro productor,
+        p.ej. el micro-batcher) como máximo `timeout` segundos.
+        """
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timeouts += 1
+            raise
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'timeout_s': self.timeout,
+                'pending': self._pending,
+                'submitted': self._submitted,
+                'rejected': self._rejected,
+                'timeouts': self._timeouts,
+            }
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+
+'''
+Exporta los modelos de Keras a TFLite cuantizado para el backend
+MODEL_BACKEND=tflite de la API (ver tflite_backend.py):
+    float16 -> pesos en float16
+    int8    -> cuantización de rango dinámico (pesos int8, activaciones float)
+Los LSTM solo se convierten con un tamaño de lote fijo, así que se
+genera un archivo por cada tamaño de lote.
+Se ejecuta desde proyecto_backend: python src/board/export_tflite.py
+'''
+
+# Modelo -> tamaños de lote a exportar
+models = {
+    "weather-1.0.keras": [1],
+    os.environ.get("COM_MODEL", "COM-3.0.keras"): [1, 32],
+}
+quantizations = ["float16", "int8"]
+
+
+def convert(model, batch_size, quantization):
+    signature = tf.TensorSpec((batch_size,) + tuple(model.input_shape[1:]), tf.float32)
+    with tempfile.TemporaryDirectory() as saved_model:
+        model.export(saved_model, input_signature=[signature], verbose=False)
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        return converter.convert()
+
+
+print("|modelo|cuantización|lote|tamaño (KB)|")
+print("---------------------------")
+for model_name, batch_sizes in models.items():
+    model = load_model(model_name)
+    stem = os.path.splitext(model_name)[0]
+    print(f"| {model_name} | keras | - | {os.path.getsize(model_name) / 1024:.1f} |")
+    for quantization in quantizations:
+        for batch_size in batch_sizes:
+            path = f"{stem}.{quantization}.b{batch_size}.tflite"
+            with open(path, "wb") as f:
+                f.write(convert(model, batch_size, quantization))
+            print(f"| {path} | {quantization} | {batch_size} | {os.path.getsize(path) / 1024:.1f} |")
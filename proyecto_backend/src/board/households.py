@@ -0,0 +1,55 @@
+import json
+import time
+import sqlite3
+
+
+class HouseholdStore:
+    """
+    Últimas 47 lecturas de cada hogar visto en /predict/com/batch, en una
+    base SQLite compartida por todos los workers de gunicorn (el scheduler
+    corre en uno solo y debe ver los hogares registrados en cualquiera).
+    Conserva como máximo `max_size` hogares, descartando los más antiguos.
+
+    Cada operación abre su propia conexión: no se comparten entre hilos
+    ni sobreviven al fork.
+    """
+
+    def __init__(self, path, max_size=1024, timeout=5.0):
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        db = self._connect()
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS households "
+                       "(id TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)")
+        finally:
+            db.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.timeout)
+
+    def register(self, ids, seqs):
+        # El id se guarda como JSON para conservar si era texto o número
+        now = time.time()
+        rows = [(json.dumps(seq_id), json.dumps([float(v) for v in seq]), now)
+                for seq_id, seq in zip(ids, seqs)]
+        db = self._connect()
+        try:
+            with db:
+                db.executemany("INSERT OR REPLACE INTO households VALUES (?, ?, ?)", rows)
+                # Solo las filas que sobran a partir de max_size (por lo general ninguna)
+                db.execute("DELETE FROM households WHERE rowid IN (SELECT rowid FROM households "
+                           "ORDER BY updated DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                           (self.max_size,))
+        finally:
+            db.close()
+
+    def all(self):
+        """{id: secuencia} del más antiguo al más reciente."""
+        db = self._connect()
+        try:
+            rows = db.execute("SELECT id, data FROM households ORDER BY updated, rowid").fetchall()
+        finally:
+            db.close()
+        return {json.loads(seq_id): json.loads(data) for seq_id, data in rows}
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import signal
+import threading
+import subprocess
+import numpy as np
+import requests
+
+
+'''
+Prueba de carga del modo de producción (gunicorn -c gunicorn.conf.py).
+Para cada número de workers levanta el servidor, espera a /readyz y
+envía peticiones concurrentes durante DURATION segundos; imprime las
+peticiones por segundo y la latencia para ver cómo escala con los núcleos.
+Se ejecuta desde proyecto_backend: python src/board/load_test.py
+
+Variables de entorno: LOAD_TEST_WORKERS (p.ej. "1,2,4"), CONCURRENCY,
+DURATION, ENDPOINT (/predict/com por defecto), PORT.
+'''
+
+worker_counts = [int(n) for n in os.environ.get("LOAD_TEST_WORKERS", f"1,{os.cpu_count()}").split(",")]
+concurrency = int(os.environ.get("CONCURRENCY", 16))
+duration = float(os.environ.get("DURATION", 20))
+endpoint = os.environ.get("ENDPOINT", "/predict/com")
+port = int(os.environ.get("PORT", 5055))
+base_url = f"http://127.0.0.1:{port}"
+
+rng = np.random.default_rng(0)
+# Misma escala de los datos de prueba del dashboard
+payload = (rng.random(47) / 3).tolist()
+
+
+def wait_ready(timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(base_url + "/readyz", timeout=2).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(1)
+    raise TimeoutError("El servidor no quedó listo")
+
+
+def client(stop, latencies, errors):
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            ok = session.post(base_url + endpoint, json=payload, timeout=60).status_code == 200
+        except requests.RequestException:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(1)
+
+
+def run_load():
+    stop = threading.Event()
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(stop, latencies, errors)) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), len(errors)
+
+
+print(f"{endpoint}, {concurrency} clientes, {duration:.0f} s por prueba, {os.cpu_count()} núcleos")
+print("|workers|req/s|p50 (ms)|p95 (ms)|errores|")
+print("---------------------------")
+for workers in worker_counts:
+    env = dict(os.environ, WEB_WORKERS=str(workers), PORT=str(port), FORECAST_SCHEDULER="off")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready()
+        # Calentamiento (trazado de funciones, cachés)
+        for _ in range(workers * 4):
+            requests.post(base_url + endpoint, json=payload, timeout=60)
+        latencies, errors = run_load()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+    if len(latencies):
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+        print(f"| {workers} | {len(latencies) / duration:.1f} | {p50:.1f} | {p95:.1f} | {errors} |")
+    else:
+        print(f"| {workers} | 0 | - | - | {errors} |")
@@ -0,0 +1,97 @@
+import time
+import threading
+
+
+class ModelLoader:
+    """
+    Registro de modelos que se cargan fuera del import del módulo.
+
+    Con start() todos los modelos se cargan en un hilo de fondo y Flask
+    puede atender rutas livianas de inmediato. Si nunca se llama start(),
+    cada modelo se carga de forma perezosa en su primer get().
+
+    Estados posibles de cada modelo: pending, loading, ready, failed.
+
+    `identity` (opcional) describe los archivos de los que se cargó el
+    modelo (p.ej. nombre y sha256); se calcula justo antes de cargarlo,
+    así identity(name) corresponde al modelo que está en memoria.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._values = {}
+        self._status = {}
+        self._errors = {}
+        self._load_times = {}
+        self._identities = {}
+        self._identify = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, name, loader, identity=None):
+        """`loader` es una función sin argumentos que devuelve el objeto listo para usar."""
+        self._loaders[name] = loader
+        self._identify[name] = identity
+        self._status[name] = 'pending'
+        self._locks[name] = threading.Lock()
+
+    def start(self):
+        """Lanza la carga de todos los modelos en un hilo de fondo."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.load_all, name="model-loader", daemon=True)
+                self._thread.start()
+
+    def load_all(self):
+        for name in self._loaders:
+            self.load(name)
+
+    def load(self, name):
+        with self._locks[name]:
+            if self._status[name] in ('ready', 'failed'):
+                return
+            self._status[name] = 'loading'
+            start = time.perf_counter()
+            try:
+                if self._identify[name] is not None:
+                    self._identities[name] = self._identify[name]()
+                self._values[name] = self._loaders[name]()
+                self._status[name] = 'ready'
+            except Exception as e:
+                print(f"Error loading {name} model: {e}")
+                self._errors[name] = str(e)
+                self._status[name] = 'failed'
+            self._load_times[name] = time.perf_counter() - start
+
+    def get(self, name):
+        """
+        Devuelve el modelo si está listo, o None si aún se está cargando
+        en segundo plano o si falló su carga.
+        """
+        if self._thread is None and self._status[name] != 'ready':
+            self.load(name)
+        return self._values.get(name)
+
+    def status(self, name):
+        return self._status[name]
+
+    def identity(self, name):
+        """Identidad del modelo cargado; None si no está listo."""
+        if self._status[name] != 'ready':
+            return None
+        return self._identities.get(name)
+
+    def ready(self):
+        return all(status == 'ready' for status in self._status.values())
+
+    def report(self):
+        return {
+            name: {
+                'status': self._status[name],
+                'load_time': self._load_times.get(name),
+                'error': self._errors.get(name),
+                'identity': self.identity(name),
+            }
+            for name in self._loaders
+        }
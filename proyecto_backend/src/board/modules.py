@@ -1,148 +1,691 @@
+import io
 import os
+import hashlib
+import asyncio
 import json
+import pickle
+import logging
+import sqlite3
+from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify
-from tensorflow.keras.models import load_model
 import numpy as np
-import pickle
 import pandas as pd
+from GEN import pv_simulation
+from GEN.context import ForecastContext
+from GEN.forecast import (PV_WEATHER_VARS, forecast_timestamps, forecast_with_solar_power,
+                          inverse_forecast, scaled_window)
+from GEN.historical import build_historical_index
+from GEN.precision import as_model_input, float32_scaler
+from .artifacts import ArtifactRegistry
+from .batching import MicroBatcher
+from .cache import ForecastCache, fingerprint
+from .executor import InferenceExecutor, QueueFull
+from .households import HouseholdStore
+from .loader import ModelLoader
+from .responses import (BodyCache, cached_columnar_response, columnar, columnar_response,
+                        nan_to_none, rows_to_columnar)
+from .scheduler import ForecastScheduler, ForecastStore
 
 bp = Blueprint("modules", __name__)
+logger = logging.getLogger(__name__)
 
-# Carga de modelos
-try:
-    WEATHER_MODEL = load_model("weather-1.0.keras")
-except Exception as e:
-    print(f"Error loading weather model: {e}")
-    WEATHER_MODEL = None
+GEN_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__),
+                 "..", "..", "models_media", "processed_datasets", "GEN")
+)
+GEN_ARTIFACTS = ArtifactRegistry(GEN_DIR)
 
-try:
-    COM_MODEL = load_model("COM-3.0.keras")
-except Exception as e:
-    print(f"Error loading COM model: {e}")
-    COM_MODEL = None
 
+def last_sample():
+    """Últimas filas de entrada del modelo de clima (Parquet columnar)."""
+    return GEN_ARTIFACTS.get("df_last_sample.parquet", loader=lambda raw: pd.read_parquet(io.BytesIO(raw)))
 
-@bp.route('/predict/weather', methods=['POST'])
-def predict_weather():
+
+def scaler(name, optional=False):
+    """StandardScaler de GEN con sus parámetros en float32."""
+    return GEN_ARTIFACTS.get(name, loader=lambda raw: float32_scaler(pickle.loads(raw)), optional=optional)
+
+
+# Parámetros del pronóstico recursivo de consumo
+COM_WINDOW = 47
+COM_STEPS = 48
+COM_MAX_BATCH = int(os.environ.get("COM_MAX_BATCH", 1024))
+
+# Simulación PV: límite de paneles por petición
+PV_MAX_PANELS = int(os.environ.get("PV_MAX_PANELS", 10000))
+
+# Carga de modelos (fuera del import: TensorFlow solo se importa al cargarlos)
+WEATHER_MODEL_NAME = "weather-1.0.keras"
+COM_MODEL_NAME = os.environ.get("COM_MODEL", "COM-3.0.keras")
+
+# MODEL_BACKEND=tflite sirve los modelos cuantizados de export_tflite.py
+# (TFLITE_QUANTIZATION=float16 o int8) sin cargar TensorFlow
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "keras")
+TFLITE_QUANTIZATION = os.environ.get("TFLITE_QUANTIZATION", "float16")
+
+# Hilos de inferencia de este proceso (con gunicorn, de cada worker); 0 = automático
+INTRA_OP_THREADS = int(os.environ.get("INTRA_OP_THREADS", 0))
+INTER_OP_THREADS = int(os.environ.get("INTER_OP_THREADS", 0))
+
+
+def load_keras_model(name):
+    import tensorflow as tf
+    # Solo se puede configurar antes de que TensorFlow se inicialice,
+    # es decir, al cargar el primer modelo del proceso
     try:
-        if WEATHER_MODEL is None:
-            return jsonify({'error': 'Weather model not found or failed to load'}), 404
+        tf.config.threading.set_intra_op_parallelism_threads(INTRA_OP_THREADS)
+        tf.config.threading.set_inter_op_parallelism_threads(INTER_OP_THREADS)
+    except RuntimeError:
+        pass
+    return tf.keras.models.load_model(name)
 
-        # Paths
-        base = os.path.normpath(
-            os.path.join(os.path.dirname(__file__),
-                         "..", "..", "models_media", "processed_datasets", "GEN")
-        )
-        meta_p = os.path.join(base, "metadata.pkl")
-        sx_p   = os.path.join(base, "scaler_X.pkl")
-        sy_p   = os.path.join(base, "scaler_y.pkl")
-        df_p   = os.path.join(base, "df_last_sample.pkl")
-
-        # Cargo metadata y scalers
-        with open(meta_p, 'rb') as f:
-            metadata = pickle.load(f)
-        with open(sx_p, 'rb') as f:
-            scaler_X = pickle.load(f)
-
-        # Intento cargar el scaler de salida (puede no existir)
-        scaler_Y = None
-        if os.path.exists(sy_p):
-            with open(sy_p, 'rb') as f:
-                scaler_Y = pickle.load(f)
-
-        window_size        = metadata['window_size']
-        features_extendidos= metadata['features_extendidos']
-
-        # Preparo input
-        df_last    = pd.read_pickle(df_p)
-        inp        = df_last.iloc[-window_size:][features_extendidos]
-        inp_sc     = scaler_X.transform(inp)
-        input_arr  = inp_sc.reshape(1, window_size, len(features_extendidos))
-
-        # Predicción escalada
-        pred_scaled = WEATHER_MODEL.predict(input_arr)  # e.g. (1, N) o (1, steps, features)
-        arr = np.array(pred_scaled)
-
-        # Reconstruyo flat 2D: (steps, features)
-        if arr.ndim == 3:
-            # salida (1, steps, features)
-            flat_2d = arr[0]
-            steps, feat_cnt = flat_2d.shape
-        elif arr.ndim == 2:
-            # salida (1, total_len)
-            total_len = arr.shape[1]
-            # determinar número de features
-            if scaler_Y is not None:
-                feat_cnt = scaler_Y.scale_.shape[0]
-            else:
-                feat_cnt = len(features_extendidos)
-            steps = total_len // feat_cnt
-            flat_2d = arr[0].reshape(steps, feat_cnt)
-        else:
-            # improbable, pero por si acaso
-            flat_2d = arr.reshape(-1, 1)
-            steps, feat_cnt = flat_2d.shape
 
-        # Invierto escala si tengo scaler_Y y coincide el número de features
-        if scaler_Y is not None and scaler_Y.scale_.shape[0] == feat_cnt:
-            unscaled_2d = scaler_Y.inverse_transform(flat_2d)
-        else:
-            unscaled_2d = flat_2d
+def load_weather_model():
+    if MODEL_BACKEND == "tflite":
+        from .tflite_backend import load_tflite_model
+        return load_tflite_model(WEATHER_MODEL_NAME, TFLITE_QUANTIZATION, num_threads=INTRA_OP_THREADS or None)
+    return load_keras_model(WEATHER_MODEL_NAME)
 
-        # Aplano para devolver [ [ … ] ]
-        flattened = unscaled_2d.flatten().tolist()
-        output = [flattened]
 
-        return jsonify({
+def load_com_rollout():
+    if MODEL_BACKEND == "tflite":
+        from .tflite_backend import load_tflite_model, tflite_rollout
+        model = load_tflite_model(COM_MODEL_NAME, TFLITE_QUANTIZATION, num_threads=INTRA_OP_THREADS or None)
+        return tflite_rollout(model, COM_STEPS)
+    # El rollout de COM se traza una sola vez por modelo cargado
+    from COM.rollout import compile_rollout
+    return compile_rollout(load_keras_model(COM_MODEL_NAME), COM_STEPS)
+
+
+# Archivos de los modelos (rutas relativas a proyecto_backend, como al cargarlos)
+MODEL_FILES = ArtifactRegistry(".")
+
+
+def model_files(name):
+    if MODEL_BACKEND == "tflite":
+        from .tflite_backend import artifact_paths
+        return sorted(artifact_paths(name, TFLITE_QUANTIZATION))
+    return [name]
+
+
+def model_identity(name):
+    """Nombre, backend y sha256 de los archivos del modelo; se guarda con cada pronóstico publicado."""
+    digest = hashlib.sha256()
+    for path in model_files(name):
+        MODEL_FILES.get(path, loader=lambda raw: None)
+        digest.update(MODEL_FILES.digest(path).encode())
+    return {'name': name, 'backend': MODEL_BACKEND, 'sha256': digest.hexdigest()}
+
+
+MODELS = ModelLoader()
+MODELS.register('weather', load_weather_model, identity=lambda: model_identity(WEATHER_MODEL_NAME))
+MODELS.register('com', load_com_rollout, identity=lambda: model_identity(COM_MODEL_NAME))
+
+
+def model_unavailable(name, label):
+    if MODELS.status(name) == 'failed':
+        return jsonify({'error': f'{label} model not found or failed to load'}), 404
+    return jsonify({'error': f'{label} model is still loading'}), 503, {'Retry-After': '5'}
+
+
+# La inferencia de /predict corre en un pool acotado: con la cola llena
+# se responde 429 y un pronóstico que pasa de INFERENCE_TIMEOUT segundos
+# responde 504. El hilo del servidor que atiende la petición (gthread/WSGI:
+# la vista async corre con asgiref) sí queda esperando el resultado, pero
+# como mucho INFERENCE_TIMEOUT segundos y solo para las peticiones que
+# entraron en la cola, así quedan hilos libres para /results y los health checks
+INFERENCE = InferenceExecutor(
+    workers=int(os.environ.get("INFERENCE_WORKERS", 4)),
+    queue_size=int(os.environ.get("INFERENCE_QUEUE", 16)),
+    timeout=float(os.environ.get("INFERENCE_TIMEOUT", 30)),
+)
+
+
+def inference_error(e):
+    if isinstance(e, QueueFull):
+        return jsonify({'error': 'Too many pending predictions, retry later'}), 429, {'Retry-After': '1'}
+    return jsonify({'error': f'Prediction timed out after {INFERENCE.timeout:g} s'}), 504
+
+
+# Pronósticos de clima ya calculados; por defecto duran un periodo de datos (PT5M)
+WEATHER_CACHE = ForecastCache(
+    maxsize=int(os.environ.get("WEATHER_CACHE_SIZE", 32)),
+    ttl=float(os.environ.get("WEATHER_CACHE_TTL", 300)),
+)
+
+
+def forecast_weather(weather_model):
+    """Pronóstico del modelo de clima sobre la última ventana de df_last_sample."""
+    # Artefactos en memoria (solo se recargan si cambian en disco)
+    metadata = GEN_ARTIFACTS.get("metadata.pkl")
+    scaler_X = scaler("scaler_X.pkl")
+
+    # El scaler de salida puede no existir
+    scaler_Y = scaler("scaler_y.pkl", optional=True)
+
+    # Mismo camino que predict_next_day: ventana escalada y bloque
+    # (horizonte, variables) desescalado de una vez
+    df_last = last_sample()
+    input_arr = scaled_window(df_last, scaler_X, metadata)
+
+    # Misma ventana escalada y mismo modelo => mismo pronóstico
+    version = f"{WEATHER_MODEL_NAME}:{GEN_ARTIFACTS.digest('scaler_y.pkl')}"
+    cache_key = fingerprint(input_arr, version)
+    output = WEATHER_CACHE.get(cache_key)
+    if output is None:
+        values = inverse_forecast(weather_model.predict(input_arr, verbose=0), scaler_Y, metadata)
+        output = columnar(forecast_timestamps(df_last.index[-1], len(values)),
+                          dict(zip(metadata['target_vars'], values.T)))
+        WEATHER_CACHE.put(cache_key, output)
+    return output
+
+
+def published_weather_forecast():
+    """
+    Los primeros pasos (horizonte del LSTM) del pronóstico publicado por
+    el scheduler si se calcularon desde el df_last_sample actual; son los
+    mismos valores que daría forecast_weather. None si no lo cubre.
+    """
+    published = published_forecast('weather', 'weather')
+    if published is None:
+        return None
+    metadata = GEN_ARTIFACTS.get("metadata.pkl")
+    df_last = last_sample()
+    if published['published'] * 1e9 < GEN_ARTIFACTS.mtime("df_last_sample.parquet"):
+        return None
+
+    horizon = metadata['forecast_horizon']
+    table = published['data']
+    expected = forecast_timestamps(df_last.index[-1], horizon).strftime('%Y-%m-%d %H:%M:%S').tolist()
+    if table['timestamps'][:horizon] != expected:
+        return None
+    output = {'timestamps': expected}
+    for var in metadata['target_vars']:
+        output[var] = table[var][:horizon]
+    return output
+
+
+@bp.route('/predict/weather', methods=['POST'])
+async def predict_weather():
+    try:
+        # El pronóstico ya publicado cubre la petición: no hace falta inferencia
+        output = published_weather_forecast()
+        if output is None:
+            weather_model = MODELS.get('weather')
+            if weather_model is None:
+                return model_unavailable('weather', 'Weather')
+            output = await INFERENCE.run(forecast_weather, weather_model)
+
+        # Tabla columnar {"timestamps": [...], "<variable>": [...]}
+        return columnar_response(request, {
             'model': 'weather',
             'prediction': output
-        })
+        }, table='prediction')
 
+    except (QueueFull, asyncio.TimeoutError) as e:
+        return inference_error(e)
     except Exception as e:
         import traceback; traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
 
+# Micro-batching: las peticiones de COM que llegan dentro de
+# COM_BATCH_WINDOW_MS se ejecutan juntas (hasta COM_BATCH_MAX secuencias);
+# COM_BATCH_WINDOW_MS=0 lo desactiva. Mientras esperan su lote las
+# peticiones no ocupan un lugar del pool de inferencia (el lote no queda
+# limitado a INFERENCE_WORKERS), aunque su hilo del servidor sí espera;
+# con más de COM_BATCH_QUEUE secuencias pendientes se responde 429
+COM_BATCH_WINDOW_MS = float(os.environ.get("COM_BATCH_WINDOW_MS", 5))
+COM_BATCHER = MicroBatcher(
+    lambda seqs: MODELS.get('com')(seqs),
+    window=COM_BATCH_WINDOW_MS / 1000,
+    max_batch=int(os.environ.get("COM_BATCH_MAX", 256)),
+    max_pending=int(os.environ.get("COM_BATCH_QUEUE", max(1024, COM_MAX_BATCH))),
+)
+
+
+def is_number(value):
+    """Número JSON (int o float, sin booleanos)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def is_com_window(data):
+    """Lista de exactamente COM_WINDOW números (sin booleanos)."""
+    return isinstance(data, list) and len(data) == COM_WINDOW and all(is_number(v) for v in data)
+
+
+def forecast_com(input_seqs):
+    """
+    Pronóstico recursivo de COM_STEPS pasos para un lote de secuencias.
+    Todas las secuencias avanzan juntas como un único tensor (N, 47, 1)
+    dentro de una función compilada, así la petición hace una sola
+    llamada sin importar N ni el número de pasos. Con micro-batching,
+    además se juntan con las de otras peticiones concurrentes.
+    """
+    input_seqs = as_model_input(input_seqs).reshape(-1, COM_WINDOW)
+    if COM_BATCH_WINDOW_MS > 0:
+        return COM_BATCHER.submit(input_seqs).result()
+    return MODELS.get('com')(input_seqs)
+
+
+async def forecast_com_async(input_seqs):
+    """
+    forecast_com para las vistas async: con micro-batching se espera el
+    Future del lote sin ocupar un lugar del pool de inferencia (el hilo
+    del servidor que atiende la petición sí espera); sin él, la llamada
+    al modelo corre en el pool de inferencia.
+    """
+    input_seqs = as_model_input(input_seqs).reshape(-1, COM_WINDOW)
+    if COM_BATCH_WINDOW_MS > 0:
+        return await INFERENCE.wait(COM_BATCHER.submit(input_seqs))
+    return await INFERENCE.run(MODELS.get('com'), input_seqs)
+
+
 @bp.route('/predict/com', methods=['POST'])
-def predict_com():
+async def predict_com():
+    try:
+        input_data = request.get_json(force=True, silent=True)
+        if input_data is None:
+            return jsonify({'error': 'El cuerpo no es un JSON válido.'}), 400
+        if not is_com_window(input_data):
+            return jsonify({'error': f'Se requiere una lista de {COM_WINDOW} números.'}), 400
+
+        # Misma ventana que un hogar ya pronosticado por el scheduler
+        prediction = published_com_forecasts()['by_window'].get(com_window_key(input_data))
+        if prediction is None:
+            if MODELS.get('com') is None:
+                return model_unavailable('com', 'COM')
+            prediction = (await forecast_com_async(input_data))[0].tolist()
+
+        return jsonify({
+            'model': 'com',
+            'prediction': prediction
+        })
+
+    except (QueueFull, asyncio.TimeoutError) as e:
+        return inference_error(e)
+    except Exception as e:
+        import traceback; traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/predict/com/batch', methods=['POST'])
+async def predict_com_batch():
+    """
+    Recibe una lista [{"id": ..., "data": [47 valores]}, ...] y devuelve
+    el pronóstico de cada hogar en el mismo orden.
+    """
     try:
-        if COM_MODEL is None:
-            return jsonify({'error': 'COM model not found or failed to load'}), 404
-
-        input_data = request.get_json(force=True)
-        if len(input_data) != 47:
-            return jsonify({'error': 'Se requieren 47 datos iniciales.'}), 400
-
-        input_seq = np.array(input_data).reshape(1, 47, 1)
-        predictions = []
-        for _ in range(48):
-            pred = COM_MODEL.predict(input_seq)
-            next_val = float(pred[0][0])
-            predictions.append(next_val)
-            new_seq = np.concatenate((input_seq[0][1:], [[next_val]]), axis=0)
-            input_seq = new_seq.reshape(1, 47, 1)
+        input_data = request.get_json(force=True, silent=True)
+        if input_data is None:
+            return jsonify({'error': 'El cuerpo no es un JSON válido.'}), 400
+        if not isinstance(input_data, list) or not input_data:
+            return jsonify({'error': 'Se requiere una lista no vacía de secuencias.'}), 400
+        if len(input_data) > COM_MAX_BATCH:
+            return jsonify({'error': f'Se permiten como máximo {COM_MAX_BATCH} secuencias por lote.'}), 400
+
+        ids, seqs = [], []
+        for index, item in enumerate(input_data):
+            if not isinstance(item, dict) or 'id' not in item or 'data' not in item:
+                return jsonify({'error': f'La secuencia {index} debe ser un objeto con los campos "id" y "data".'}), 400
+            if not (isinstance(item['id'], str) or (is_number(item['id']) and np.isfinite(item['id']))):
+                return jsonify({'error': f'El "id" de la secuencia {index} debe ser texto o un número finito.'}), 400
+            if not is_com_window(item['data']):
+                return jsonify({'error': f'La secuencia {index} requiere una lista de {COM_WINDOW} números.'}), 400
+            ids.append(item['id'])
+            seqs.append(item['data'])
+
+        # Solo se infieren los hogares sin un pronóstico publicado para esa misma ventana
+        published = published_com_forecasts()['by_household']
+        predictions = [published.get(com_household_key(seq_id, seq)) for seq_id, seq in zip(ids, seqs)]
+        missing = [i for i, pred in enumerate(predictions) if pred is None]
+        if missing:
+            if MODELS.get('com') is None:
+                return model_unavailable('com', 'COM')
+            computed = await forecast_com_async([seqs[i] for i in missing])
+            for i, pred in zip(missing, computed.tolist()):
+                predictions[i] = pred
+        register_households(ids, seqs)
 
         return jsonify({
             'model': 'com',
-            'prediction': predictions
+            'predictions': [
+                {'id': seq_id, 'prediction': pred}
+                for seq_id, pred in zip(ids, predictions)
+            ]
         })
 
+    except (QueueFull, asyncio.TimeoutError) as e:
+        return inference_error(e)
     except Exception as e:
         import traceback; traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
 
+def weather_frame(weather):
+    """
+    Convierte un pronóstico de clima en un DataFrame indexado por fecha.
+    Acepta formato columnar {"timestamps": [...], "ghi": [...], ...} o
+    por filas {timestamp: {"ghi": ..., ...}} como en weather_results.json.
+    """
+    if 'timestamps' in weather:
+        columns = {var: values for var, values in weather.items() if var != 'timestamps'}
+        frame = pd.DataFrame(columns, index=pd.to_datetime(weather['timestamps']))
+    else:
+        frame = pd.DataFrame.from_dict(weather, orient='index')
+        frame.index = pd.to_datetime(frame.index)
+    return frame.sort_index()
+
+
+def latest_weather_forecast():
+    """
+    Último pronóstico de clima completo: el publicado por el scheduler o,
+    si aún no hay uno, el de weather_results.json.
+    """
+    published = published_forecast('weather', 'weather')
+    if published is not None:
+        return weather_frame(published['data'])
+    return weather_frame(weather_results()['predictions'])
+
+
+def load_results(raw):
+    """weather_results.json con sus predicciones en formato columnar (acepta el formato por filas)."""
+    results = json.loads(raw)
+    if 'timestamps' not in results['predictions']:
+        results['predictions'] = rows_to_columnar(results['predictions'])
+    return results
+
+
+def weather_results():
+    return GEN_ARTIFACTS.get("weather_results.json", loader=load_results)
+
+
+@bp.route('/predict/generation', methods=['POST'])
+async def predict_generation():
+    """
+    Generación solar (kW) por timestamp con el modelo térmico PV.
+    Cuerpo opcional:
+        {"weather": {...}, "panels": {"A": ..., "eta": ..., "alpha": ...}, "per_panel": false}
+    Sin "weather" se usa el último pronóstico publicado. A, eta y alpha
+    pueden ser un número o una lista con un valor por panel.
+    """
+    try:
+        # El cuerpo es opcional, pero si viene debe ser un objeto JSON válido
+        body = request.get_json(force=True, silent=True)
+        if body is None and request.get_data():
+            return jsonify({'error': 'El cuerpo no es un JSON válido.'}), 400
+        body = {} if body is None else body
+        if not isinstance(body, dict):
+            return jsonify({'error': 'El cuerpo debe ser un objeto JSON.'}), 400
+
+        if body.get('weather'):
+            if not isinstance(body['weather'], dict):
+                return jsonify({'error': 'El campo "weather" debe ser un objeto (columnar o por timestamp).'}), 400
+            try:
+                weather = weather_frame(body['weather'])
+            except (ValueError, TypeError, AttributeError) as e:
+                return jsonify({'error': f'Pronóstico de clima inválido: {e}'}), 400
+        else:
+            weather = latest_weather_forecast()
+        missing = [var for var in PV_WEATHER_VARS if var not in weather.columns]
+        if missing:
+            return jsonify({'error': f'Faltan variables de clima: {", ".join(missing)}'}), 400
+        try:
+            inputs = [weather[var].to_numpy(dtype=float) for var in PV_WEATHER_VARS]
+        except (ValueError, TypeError):
+            return jsonify({'error': f'Las variables {", ".join(PV_WEATHER_VARS)} deben ser numéricas.'}), 400
+
+        panels = body.get('panels') or {}
+        if not isinstance(panels, dict):
+            return jsonify({'error': 'El campo "panels" debe ser un objeto.'}), 400
+        params = {}
+        for name in ('A', 'eta', 'alpha'):
+            value = panels.get(name, getattr(pv_simulation, name))
+            if not (is_number(value) or (isinstance(value, list) and value and all(map(is_number, value)))):
+                return jsonify({'error': f'El parámetro {name} debe ser un número o una lista de números.'}), 400
+            params[name] = np.asarray(value, dtype=float)
+        try:
+            n_panels = int(np.prod(np.broadcast_shapes(*(p.shape for p in params.values()))))
+        except ValueError:
+            return jsonify({'error': 'Los parámetros de los paneles deben tener la misma longitud.'}), 400
+        if n_panels > PV_MAX_PANELS:
+            return jsonify({'error': f'Se permiten como máximo {PV_MAX_PANELS} paneles por petición.'}), 400
+
+        power, _ = await INFERENCE.run(
+            pv_simulation.simulate_pv_power,
+            *inputs,  # ghi, air_temp, wind_speed_10m
+            pv_simulation.step_seconds(weather.index),
+            **params,
+        )
+        power_kw = power.reshape(len(weather), -1) / 1000.0
+
+        response = {
+            'model': 'pv_colab',
+            'panels': n_panels,
+            'timestamps': weather.index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
+            'solarPower': nan_to_none(power_kw.sum(axis=1)),
+        }
+        if body.get('per_panel'):
+            response['panelPower'] = [nan_to_none(panel) for panel in power_kw.T]
+        return jsonify(response)
+
+    except (QueueFull, asyncio.TimeoutError) as e:
+        return inference_error(e)
+    except Exception as e:
+        import traceback; traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+# -------------------------
+# Pronósticos precalculados (scheduler en segundo plano)
+# -------------------------
+FORECAST_STEPS = 288
+FORECAST_SCHEDULER = os.environ.get("FORECAST_SCHEDULER", "on") != "off"
+
+# Los pronósticos se publican en archivos de FORECAST_DIR que leen todos
+# los workers; el scheduler corre en un solo proceso (el que obtiene
+# scheduler.lock) y los hogares registrados se guardan en SQLite
+FORECAST_DIR = os.environ.get("FORECAST_DIR", os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "models_media", "forecasts")
+))
+FORECAST_REFRESH_SECONDS = float(os.environ.get("FORECAST_REFRESH_SECONDS", 300))
+
+# Se crean en init_forecasts (desde create_app), no al importar: crean
+# FORECAST_DIR y la base SQLite
+FORECAST_STORE = None
+SCHEDULER = None
+# Últimas 47 lecturas de cada hogar visto en /predict/com/batch
+COM_HOUSEHOLDS = None
+
+
+def published_forecast(name, model):
+    """
+    Entrada publicada `name` solo si la calculó el mismo modelo `model`
+    que está cargado y listo en este proceso (mismo nombre y sha256);
+    un pronóstico de un modelo que falló, cambió o se reentrenó no se sirve.
+    """
+    if MODELS.status(model) != 'ready':
+        return None
+    identity = MODELS.identity(model)
+    published = FORECAST_STORE.get(name)
+    if published is None or identity is None or published.get('model') != identity:
+        return None
+    return published
+
+
+def register_households(ids, seqs):
+    """
+    Guarda los hogares para el scheduler (solo si está activo). Es best
+    effort: si SQLite falla (p.ej. base bloqueada por otro worker) se
+    registra el error y la petición responde igual con sus predicciones.
+    """
+    if not FORECAST_SCHEDULER:
+        return
+    try:
+        COM_HOUSEHOLDS.register(ids, seqs)
+    except sqlite3.Error:
+        logger.warning("Could not register %d households", len(ids), exc_info=True)
+
+
+def scheduled_model(name):
+    """Modelo para un trabajo del scheduler; None si todavía está cargando."""
+    model = MODELS.get(name)
+    if model is None and MODELS.status(name) == 'failed':
+        raise RuntimeError(f'{name} model not found or failed to load')
+    return model
+
+
+def refresh_weather_forecast():
+    """Pronóstico híbrido de 288 pasos (LSTM + históricos) con la generación PV en kW."""
+    weather_model = scheduled_model('weather')
+    if weather_model is None:
+        return None
+
+    context = ForecastContext(
+        model=weather_model,
+        metadata=GEN_ARTIFACTS.get("metadata.pkl"),
+        scaler_X=scaler("scaler_X.pkl"),
+        scaler_y=scaler("scaler_y.pkl"),
+        historical_index=GEN_ARTIFACTS.get(
+            "historical_daily_means.pkl",
+            loader=lambda raw: build_historical_index(pickle.loads(raw)),
+        ),
+        df_last=last_sample(),
+    )
+    forecast = forecast_with_solar_power(context, total_steps=FORECAST_STEPS)
+    if forecast is None:
+        raise RuntimeError('weather forecast could not be generated')
+
+    return columnar(forecast.index, {var: forecast[var].to_numpy() for var in forecast.columns})
+
+
+def refresh_com_forecasts():
+    """Pronóstico de consumo de 48 pasos para todos los hogares registrados."""
+    if scheduled_model('com') is None:
+        return None
+    households = COM_HOUSEHOLDS.all()
+    if not households:
+        return []
+    predictions = forecast_com(as_model_input(list(households.values())))
+    return [
+        {'id': seq_id, 'data': seq, 'prediction': pred}
+        for (seq_id, seq), pred in zip(households.items(), predictions.tolist())
+    ]
+
+
+def com_window_key(seq):
+    return tuple(float(v) for v in seq)
+
+
+def com_household_key(seq_id, seq):
+    return json.dumps(seq_id), com_window_key(seq)
+
+
+# Índices del último pronóstico de COM publicado; se rehacen cuando cambia el archivo
+PUBLISHED_COM = {'version': None, 'by_window': {}, 'by_household': {}}
+
+
+def published_com_forecasts():
+    """Predicciones publicadas por ventana y por (hogar, ventana)."""
+    global PUBLISHED_COM
+    published = published_forecast('com', 'com')
+    version = FORECAST_STORE.version('com') if published is not None else None
+    if version != PUBLISHED_COM['version']:
+        entries = [e for e in (published['data'] if published else []) if 'data' in e]
+        PUBLISHED_COM = {
+            'version': version,
+            'by_window': {com_window_key(e['data']): e['prediction'] for e in entries},
+            'by_household': {com_household_key(e['id'], e['data']): e['prediction'] for e in entries},
+        }
+    return PUBLISHED_COM
+
+
+def init_forecasts():
+    """Crea el almacén de pronósticos, el scheduler y el registro de hogares (una sola vez)."""
+    global FORECAST_STORE, SCHEDULER, COM_HOUSEHOLDS
+    if FORECAST_STORE is not None:
+        return
+    FORECAST_STORE = ForecastStore(FORECAST_DIR)
+    COM_HOUSEHOLDS = HouseholdStore(os.path.join(FORECAST_DIR, "households.sqlite"), max_size=COM_MAX_BATCH)
+    SCHEDULER = ForecastScheduler(
+        FORECAST_STORE,
+        interval=FORECAST_REFRESH_SECONDS,
+        lock_path=os.path.join(FORECAST_DIR, "scheduler.lock"),
+    )
+    SCHEDULER.register('weather', refresh_weather_forecast, model=lambda: MODELS.identity('weather'))
+    SCHEDULER.register('com', refresh_com_forecasts, model=lambda: MODELS.identity('com'))
+
+
+@bp.route('/forecasts', methods=['GET'])
+def get_forecasts():
+    """Últimos pronósticos publicados por el scheduler, con su antigüedad."""
+    return jsonify({
+        'refresh_seconds': SCHEDULER.interval,
+        'forecasts': FORECAST_STORE.snapshot(SCHEDULER.names()),
+        'errors': SCHEDULER.errors(),
+    })
+
+
+# Cuerpos de /results ya serializados por formato y compresión
+RESULTS_BODIES = BodyCache()
+
+
+def results_document(published):
+    """weather_results.json con las predicciones del pronóstico publicado, si lo hay."""
+    results = weather_results()
+    if published is None:
+        return results
+    return {**results, 'generated_at': published['generated_at'], 'predictions': published['data']}
+
+
 @bp.route('/results', methods=['GET'])
 def get_results():
     try:
-        base   = os.path.normpath(
-            os.path.join(os.path.dirname(__file__),
-                         "..", "..", "models_media", "processed_datasets", "GEN")
+        # Métricas de weather_results.json y el último pronóstico publicado
+        # (288 pasos de clima + solarPower); formato y compresión según
+        # Accept / Accept-Encoding. Los cuerpos se serializan una vez por
+        # versión de ambos archivos y con If-None-Match / If-Modified-Since
+        # vigentes se responde 304
+        weather_results()
+        published = published_forecast('weather', 'weather')
+        mtime_ns = GEN_ARTIFACTS.mtime("weather_results.json")
+        modified = mtime_ns / 1e9
+        version = f"{mtime_ns:x}"
+        if published is not None:
+            modified = max(modified, published['published'])
+            version = f"{version}-{FORECAST_STORE.version('weather')[:16]}"
+        return cached_columnar_response(
+            request, RESULTS_BODIES,
+            version=version,
+            last_modified=datetime.fromtimestamp(modified, tz=timezone.utc),
+            load_document=lambda: results_document(published),
+            table='predictions',
         )
-        json_path = os.path.join(base, "weather_results.json")
-        with open(json_path, "r") as jf:
-            results = json.load(jf)
-        return jsonify(results)
     except Exception as e:
         import traceback; traceback.print_exc()
         return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/stats', methods=['GET'])
+def get_stats():
+    # Contadores de este worker
+    return jsonify({
+        'pid': os.getpid(),
+        'weather_cache': WEATHER_CACHE.stats(),
+        'com_batcher': COM_BATCHER.stats(),
+        'inference': INFERENCE.stats(),
+    })
+
+
+@bp.route('/healthz', methods=['GET'])
+def healthz():
+    return jsonify({'status': 'ok'})
+
+
+@bp.route('/readyz', methods=['GET'])
+def readyz():
+    ready = MODELS.ready()
+    return jsonify({
+        'ready': ready,
+        'models': MODELS.report()
+    }), 200 if ready else 503
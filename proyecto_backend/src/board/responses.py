@@ -0,0 +1,163 @@
+import gzip
+import json
+import threading
+import numpy as np
+from flask import Response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+'''
+Respuestas columnares de los pronósticos.
+
+Una tabla de pronóstico es {"timestamps": [...], "<variable>": [...], ...}:
+un arreglo por variable en lugar de un objeto por timestamp, así los
+nombres de las variables no se repiten en cada fila. El formato se
+negocia con el header Accept:
+    application/json                      (por defecto)
+    application/msgpack                   (si está instalado msgpack)
+    application/vnd.apache.arrow.stream   (Arrow IPC; el resto del documento
+                                           va como metadatos JSON del schema)
+y el cuerpo se comprime con br o gzip según Accept-Encoding.
+'''
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+
+MIMETYPES = [JSON, ARROW] + ([MSGPACK, 'application/x-msgpack'] if msgpack is not None else [])
+ENCODINGS = (['br'] if brotli is not None else []) + ['gzip']
+
+# Cuerpos más pequeños no se comprimen
+MIN_COMPRESS_SIZE = 1024
+
+
+def nan_to_none(values):
+    return [None if np.isnan(v) else v for v in np.asarray(values, dtype=float).tolist()]
+
+
+def columnar(timestamps, columns):
+    """Timestamps (DatetimeIndex) y {variable: arreglo} a tabla columnar (NaN -> None)."""
+    table = {'timestamps': timestamps.strftime('%Y-%m-%d %H:%M:%S').tolist()}
+    for var, values in columns.items():
+        table[var] = nan_to_none(values)
+    return table
+
+
+def rows_to_columnar(rows):
+    """{timestamp: {var: valor}} (formato anterior de weather_results.json) a tabla columnar."""
+    timestamps = sorted(rows)
+    variables = list(dict.fromkeys(var for ts in timestamps for var in rows[ts]))
+    table = {'timestamps': timestamps}
+    for var in variables:
+        table[var] = [rows[ts].get(var) for ts in timestamps]
+    return table
+
+
+def negotiate(request):
+    """Mimetype de respuesta según Accept (JSON si no pide uno conocido)."""
+    best = request.accept_mimetypes.best_match(MIMETYPES, default=JSON)
+    return MSGPACK if best == 'application/x-msgpack' else best
+
+
+def negotiate_encoding(request):
+    for encoding in ENCODINGS:
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def encode(document, mimetype, table):
+    """Serializa el documento; `table` es la clave que contiene la tabla columnar."""
+    if mimetype == MSGPACK:
+        return msgpack.packb(document)
+    if mimetype == ARROW:
+        import pyarrow as pa
+        import pandas as pd
+        columns = dict(document[table])
+        columns['timestamps'] = pd.to_datetime(columns['timestamps']).as_unit('s')
+        arrow_table = pa.table(columns).replace_schema_metadata({
+            key: json.dumps(value) for key, value in document.items() if key != table
+        })
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+        return sink.getvalue().to_pybytes()
+    return json.dumps(document, separators=(',', ':')).encode()
+
+
+def compress(body, encoding):
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    if encoding == 'br':
+        return brotli.compress(body, quality=5), encoding
+    return gzip.compress(body, compresslevel=6), encoding
+
+
+def make_response(body, mimetype, encoding):
+    response = Response(body, mimetype=mimetype)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
+
+
+def columnar_response(request, document, table):
+    """Respuesta negociada (formato y compresión) para un documento con una tabla columnar."""
+    mimetype = negotiate(request)
+    encoding = negotiate_encoding(request)
+    body, encoding = compress(encode(document, mimetype, table), encoding)
+    return make_response(body, mimetype, encoding)
+
+
+class BodyCache:
+    """
+    Cuerpos ya serializados y comprimidos de un documento, uno por
+    (mimetype, encoding). Se descartan todos cuando cambia `version`
+    (p.ej. el mtime del archivo), así cada representación se construye
+    una sola vez por versión del documento.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def get(self, version, mimetype, encoding, build):
+        key = (mimetype, encoding)
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._bodies = {}
+            if key not in self._bodies:
+                self._bodies[key] = build()
+            return self._bodies[key]
+
+
+def cached_columnar_response(request, cache, version, last_modified, load_document, table):
+    """
+    Como columnar_response, pero sirve el cuerpo desde `cache` y con
+    ETag / Last-Modified de `version`: si el cliente ya tiene esa versión
+    (If-None-Match / If-Modified-Since) responde 304 sin cuerpo.
+    """
+    mimetype = negotiate(request)
+    encoding = negotiate_encoding(request)
+    body, encoding = cache.get(
+        version, mimetype, encoding,
+        lambda: compress(encode(load_document(), mimetype, table), encoding),
+    )
+    response = make_response(body, mimetype, encoding)
+    # Una ETag por representación: el mismo documento en otro formato o compresión es otro cuerpo
+    response.set_etag(f"{version}-{mimetype.rsplit('/', 1)[-1]}-{encoding or 'identity'}")
+    response.last_modified = last_modified
+    # El navegador guarda la respuesta pero la revalida en cada petición
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
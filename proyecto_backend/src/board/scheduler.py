@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+from .artifacts import ArtifactRegistry
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin gunicorn, un único proceso
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class ForecastStore:
+    """
+    Último resultado publicado de cada pronóstico, guardado como
+    <nombre>.json en `directory`. publish() escribe un archivo temporal y
+    lo reemplaza con os.replace, así los lectores (todos los workers de
+    gunicorn) siempre ven una versión completa; la lectura pasa por un
+    ArtifactRegistry y solo se vuelve a deserializar cuando el archivo cambia.
+    """
+
+    STATUS = "_scheduler.json"
+
+    def __init__(self, directory, check_interval=1.0):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._files = ArtifactRegistry(directory, check_interval=check_interval)
+
+    def _write(self, filename, document):
+        # Un temporal único por escritura: dos hilos o procesos no se pisan
+        with tempfile.NamedTemporaryFile('w', dir=self.directory, prefix=f".{filename}.",
+                                         suffix=".tmp", delete=False) as f:
+            json.dump(document, f)
+        os.replace(f.name, os.path.join(self.directory, filename))
+
+    def publish(self, name, data, model=None):
+        """`model` identifica el modelo que calculó `data` (ver ModelLoader.identity)."""
+        self._write(f"{name}.json", {
+            'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'published': time.time(),
+            'model': model,
+            'data': data,
+        })
+
+    def get(self, name):
+        return self._files.get(f"{name}.json", loader=json.loads, optional=True)
+
+    def version(self, name):
+        """Hash del contenido publicado de `name` (None si no hay ninguno)."""
+        if self.get(name) is None:
+            return None
+        return self._files.digest(f"{name}.json")
+
+    def snapshot(self, names):
+        """Entradas publicadas de `names` con su antigüedad en segundos."""
+        now = time.time()
+        snapshot = {}
+        for name in names:
+            entry = self.get(name)
+            if entry is not None:
+                snapshot[name] = {
+                    'generated_at': entry['generated_at'],
+                    'age_seconds': round(now - entry['published'], 3),
+                    'model': entry.get('model'),
+                    'data': entry['data'],
+                }
+        return snapshot
+
+    def publish_status(self, status):
+        self._write(self.STATUS, status)
+
+    def status(self):
+        return self._files.get(self.STATUS, loader=json.loads, optional=True) or {}
+
+
+class ForecastScheduler:
+    """
+    Recalcula los pronósticos registrados en un hilo de fondo cada
+    `interval` segundos, alineado al reloj (p.ej. :00, :05, :10 con 300 s,
+    igual que el periodo PT5M de los datos), y publica cada resultado en
+    el ForecastStore.
+
+    Con varios procesos (workers de gunicorn) solo calcula el que obtiene
+    el flock de `lock_path`; los demás reintentan cada `retry` segundos,
+    así otro worker toma el relevo si el primero termina o se reinicia.
+
+    Un trabajo devuelve None cuando aún no puede ejecutarse (p.ej. el
+    modelo sigue cargando); en ese caso se reintenta tras `retry` segundos.
+    """
+
+    def __init__(self, store, interval=300.0, retry=5.0, lock_path=None):
+        self.store = store
+        self.interval = interval
+        self.retry = retry
+        self.lock_path = lock_path
+        self._jobs = {}
+        self._models = {}
+        self._errors = {}
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name, job, model=None):
+        """`model` devuelve la identidad del modelo del trabajo, que se publica junto al resultado."""
+        self._jobs[name] = job
+        self._models[name] = model
+
+    def names(self):
+        return list(self._jobs)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="forecast-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _acquire(self):
+        """True si este proceso es (o pasa a ser) el que calcula los pronósticos."""
+        if self.lock_path is None or fcntl is None or self._lock_file is not None:
+            return True
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # El lock se libera solo cuando el proceso termina
+        self._lock_file = lock_file
+        return True
+
+    def run_once(self):
+        """Ejecuta todos los trabajos; devuelve True si alguno quedó pendiente."""
+        pending = False
+        for name, job in self._jobs.items():
+            try:
+                data = job()
+            except Exception as e:
+                logger.exception("Error refreshing %s forecast", name)
+                self._errors[name] = str(e)
+                continue
+            if data is None:
+                pending = True
+            else:
+                model = self._models[name]
+                self.store.publish(name, data, model=model() if model else None)
+                self._errors.pop(name, None)
+        self.store.publish_status({'pid': os.getpid(), 'errors': dict(self._errors)})
+        return pending
+
+    def errors(self):
+        """Errores de la última pasada, los haya hecho este proceso u otro."""
+        return self.store.status().get('errors', {})
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._acquire():
+                self._stop.wait(self.retry)
+                continue
+            pending = self.run_once()
+            now = time.time()
+            delay = self.retry if pending else self.interval - now % self.interval
+            self._stop.wait(delay)
@@ -0,0 +1,95 @@
+import os
+import glob
+import threading
+import numpy as np
+
+try:
+    # Intérprete liviano: no importa TensorFlow
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    from tensorflow.lite import Interpreter
+
+
+'''
+Backend de inferencia con modelos TFLite cuantizados (ver export_tflite.py).
+
+Los LSTM se exportan con un tamaño de lote fijo, así que cada modelo
+puede tener varios archivos, uno por tamaño de lote:
+    <modelo>.<cuantización>.b<lote>.tflite   p.ej. COM-3.0.float16.b32.tflite
+Cada petición se parte en lotes de esos tamaños (rellenando el último).
+'''
+
+
+def artifact_paths(model_name, quantization, base_dir="."):
+    stem = os.path.splitext(os.path.basename(model_name))[0]
+    return glob.glob(os.path.join(base_dir, f"{stem}.{quantization}.b*.tflite"))
+
+
+class TFLiteModel:
+    """
+    Expone predict(x) como un modelo de Keras sobre uno o varios
+    intérpretes TFLite. Cada intérprete tiene su lock porque no se puede
+    invocar desde dos hilos a la vez.
+    """
+
+    def __init__(self, paths, num_threads=None):
+        if not paths:
+            raise FileNotFoundError("No hay artefactos .tflite para el modelo")
+        self._runners = {}
+        for path in paths:
+            interpreter = Interpreter(model_path=path, num_threads=num_threads)
+            interpreter.allocate_tensors()
+            inp = interpreter.get_input_details()[0]
+            out = interpreter.get_output_details()[0]
+            batch = int(inp['shape'][0])
+            self._runners[batch] = (interpreter, inp['index'], out['index'], threading.Lock())
+            self.input_shape = (None,) + tuple(int(d) for d in inp['shape'][1:])
+        self.batch_sizes = sorted(self._runners)
+
+    def _invoke(self, batch, x):
+        interpreter, inp, out, lock = self._runners[batch]
+        with lock:
+            interpreter.set_tensor(inp, x)
+            interpreter.invoke()
+            return interpreter.get_tensor(out).copy()
+
+    def _chunks(self, n):
+        """(inicio, fin, lote): lotes completos del mayor tamaño y el resto en el menor que lo cubra."""
+        largest = self.batch_sizes[-1]
+        start = 0
+        while start < n:
+            remaining = n - start
+            batch = next((b for b in self.batch_sizes if b >= remaining), largest)
+            stop = min(start + batch, n)
+            yield start, stop, batch
+            start = stop
+
+    def predict(self, x, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        outputs = []
+        for start, stop, batch in self._chunks(len(x)):
+            chunk = x[start:stop]
+            if len(chunk) < batch:
+                chunk = np.concatenate([chunk, np.zeros((batch - len(chunk),) + chunk.shape[1:], np.float32)])
+            outputs.append(self._invoke(batch, chunk)[:stop - start])
+        return np.concatenate(outputs)
+
+
+def load_tflite_model(model_name, quantization, base_dir=".", num_threads=None):
+    return TFLiteModel(artifact_paths(model_name, quantization, base_dir), num_threads)
+
+
+def tflite_rollout(model, steps=48):
+    """Mismo pronóstico recursivo que COM.rollout.compile_rollout, con un TFLiteModel."""
+    window = model.input_shape[1]
+
+    def run(input_seqs):
+        input_seqs = np.asarray(input_seqs, dtype=np.float32).reshape(-1, window, 1)
+        predictions = np.empty((input_seqs.shape[0], steps), dtype=np.float32)
+        for step in range(steps):
+            pred = model.predict(input_seqs)
+            predictions[:, step] = pred[:, 0]
+            input_seqs = np.concatenate((input_seqs[:, 1:], pred[:, None, :1]), axis=1)
+        return predictions
+
+    return run
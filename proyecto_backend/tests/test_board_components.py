@@ -0,0 +1,234 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import numpy as np
+import pytest
+
+# Mismo sys.path que la API (flask --app src/board)
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "src"))
+
+from board.artifacts import ArtifactRegistry  # noqa: E402
+from board.batching import MicroBatcher  # noqa: E402
+from board.executor import InferenceExecutor, QueueFull  # noqa: E402
+
+
+# -------------------------
+# MicroBatcher
+# -------------------------
+def test_micro_batcher_returns_each_request_its_own_rows():
+    """Cada petición recibe sus filas, en orden, aunque compartan lote o caigan en lotes distintos."""
+    batch_sizes = []
+
+    def fn(rows):
+        batch_sizes.append(len(rows))
+        return rows * 10
+
+    batcher = MicroBatcher(fn, window=0.05, max_batch=8)
+    requests = [np.arange(n * 3, dtype=float).reshape(n, 3) + 100 * i for i, n in enumerate([1, 3, 2, 4, 1, 5, 2])]
+    futures = [None] * len(requests)
+
+    def submit(i):
+        futures[i] = batcher.submit(requests[i])
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(requests))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for rows, future in zip(requests, futures):
+        np.testing.assert_array_equal(future.result(timeout=5), rows * 10)
+    # 18 filas con max_batch=8: al menos tres lotes, ninguno por encima del máximo
+    assert sum(batch_sizes) == 18
+    assert len(batch_sizes) >= 3 and max(batch_sizes) <= 8
+    stats = batcher.stats()
+    assert stats['requests'] == len(requests) and stats['batches'] == len(batch_sizes)
+    assert stats['pending_rows'] == 0
+
+
+def test_micro_batcher_propagates_errors_to_the_whole_batch():
+    def fn(rows):
+        raise ValueError("modelo roto")
+
+    batcher = MicroBatcher(fn, window=0.01)
+    future = batcher.submit(np.zeros((2, 3)))
+    with pytest.raises(ValueError, match="modelo roto"):
+        future.result(timeout=5)
+    assert batcher.stats()['pending_rows'] == 0
+
+
+def test_micro_batcher_rejects_rows_over_max_pending():
+    release = threading.Event()
+
+    def fn(rows):
+        release.wait(5)
+        return rows
+
+    batcher = MicroBatcher(fn, window=0.001, max_pending=4)
+    first = batcher.submit(np.zeros((3, 2)))
+    with pytest.raises(QueueFull):
+        batcher.submit(np.zeros((2, 2)))
+    assert batcher.stats()['rejected'] == 1
+
+    release.set()
+    first.result(timeout=5)
+    # Al resolverse el lote se liberan sus filas
+    batcher.submit(np.zeros((4, 2))).result(timeout=5)
+    assert batcher.stats()['pending_rows'] == 0
+
+
+# -------------------------
+# InferenceExecutor
+# -------------------------
+def test_executor_rejects_when_workers_and_queue_are_full():
+    release = threading.Event()
+    executor = InferenceExecutor(workers=1, queue_size=1, timeout=5)
+    running = executor.submit(release.wait, 5)
+    queued = executor.submit(lambda: 'ok')
+    with pytest.raises(QueueFull):
+        executor.submit(lambda: 'rechazada')
+
+    release.set()
+    assert running.result(timeout=5) is True
+    assert queued.result(timeout=5) == 'ok'
+    stats = executor.stats()
+    assert stats['rejected'] == 1 and stats['submitted'] == 2
+    # Los lugares se liberan al terminar
+    assert executor.submit(lambda: 1).result(timeout=5) == 1
+
+
+def test_executor_run_times_out_and_counts_it():
+    executor = InferenceExecutor(workers=1, queue_size=0, timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(executor.run(time.sleep, 0.5))
+    assert executor.stats()['timeouts'] == 1
+    # El trabajo que ya corría conserva su lugar hasta terminar
+    deadline = time.monotonic() + 5
+    while executor.stats()['pending'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert asyncio.run(executor.run(lambda x: x + 1, 1)) == 2
+
+
+# -------------------------
+# ArtifactRegistry
+# -------------------------
+def set_mtime(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_registry_reloads_only_when_mtime_and_content_change(tmp_path):
+    path = tmp_path / "scaler.bin"
+    path.write_bytes(b"v1")
+    set_mtime(path, 1_000_000_000_000)
+    loads = []
+
+    def loader(raw):
+        loads.append(raw)
+        return raw.decode()
+
+    registry = ArtifactRegistry(str(tmp_path), check_interval=0)
+    assert registry.get("scaler.bin", loader=loader) == "v1"
+    assert registry.get("scaler.bin", loader=loader) == "v1"
+    assert len(loads) == 1
+    first_digest = registry.digest("scaler.bin")
+
+    # Mismo contenido con otro mtime: se rehace el hash pero no se deserializa de nuevo
+    set_mtime(path, 2_000_000_000_000)
+    assert registry.get("scaler.bin", loader=loader) == "v1"
+    assert len(loads) == 1
+    assert registry.mtime("scaler.bin") == 2_000_000_000_000
+    assert registry.digest("scaler.bin") == first_digest
+
+    # Contenido nuevo: se vuelve a cargar
+    path.write_bytes(b"v2")
+    set_mtime(path, 3_000_000_000_000)
+    assert registry.get("scaler.bin", loader=loader) == "v2"
+    assert len(loads) == 2
+    assert registry.digest("scaler.bin") != first_digest
+
+
+def test_registry_checks_disk_at_most_once_per_interval(tmp_path):
+    path = tmp_path / "metadata.bin"
+    path.write_bytes(b"v1")
+    set_mtime(path, 1_000_000_000_000)
+    registry = ArtifactRegistry(str(tmp_path), check_interval=60)
+    assert registry.get("metadata.bin", loader=bytes) == b"v1"
+
+    path.write_bytes(b"v2")
+    set_mtime(path, 2_000_000_000_000)
+    assert registry.get("metadata.bin", loader=bytes) == b"v1"
+
+
+def test_registry_optional_and_missing_artifacts(tmp_path):
+    registry = ArtifactRegistry(str(tmp_path), check_interval=0)
+    assert registry.get("scaler_y.pkl", optional=True) is None
+    with pytest.raises(FileNotFoundError):
+        registry.get("scaler_y.pkl")
+
+    (tmp_path / "scaler_y.pkl").write_bytes(b"ok")
+    assert registry.get("scaler_y.pkl", loader=bytes, optional=True) == b"ok"
+
+
+# -------------------------
+# Respuestas 429 / 504 de /predict/com
+# -------------------------
+@pytest.fixture
+def com_api(tmp_path, monkeypatch):
+    """API con un modelo COM de prueba y el scheduler apagado."""
+    monkeypatch.setenv("MODEL_LOADING", "lazy")
+    monkeypatch.setenv("FORECAST_SCHEDULER", "off")
+    import board
+    from board import modules
+    from board.loader import ModelLoader
+
+    release = threading.Event()
+
+    def rollout(seqs):
+        release.wait(5)
+        return np.repeat(seqs[:, -1:], modules.COM_STEPS, axis=1)
+
+    models = ModelLoader()
+    models.register('com', lambda: rollout)
+    monkeypatch.setattr(modules, "MODELS", models)
+    monkeypatch.setattr(modules, "FORECAST_DIR", str(tmp_path))
+    monkeypatch.setattr(modules, "FORECAST_SCHEDULER", False)
+    for name in ("FORECAST_STORE", "SCHEDULER", "COM_HOUSEHOLDS"):
+        monkeypatch.setattr(modules, name, None)
+    client = board.create_app().test_client()
+    yield client, modules, release
+    release.set()
+
+
+WINDOW = [float(i) for i in range(47)]
+
+
+def test_com_batcher_backpressure_answers_429(com_api, monkeypatch):
+    client, modules, release = com_api
+    batcher = MicroBatcher(lambda seqs: modules.MODELS.get('com')(seqs), window=0.001, max_pending=1)
+    monkeypatch.setattr(modules, "COM_BATCHER", batcher)
+
+    pending = batcher.submit(np.zeros((1, 47), dtype=np.float32))
+    response = client.post('/predict/com', json=WINDOW)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+
+    release.set()
+    pending.result(timeout=5)
+    response = client.post('/predict/com', json=WINDOW)
+    assert response.status_code == 200
+    assert response.get_json()['prediction'] == [WINDOW[-1]] * modules.COM_STEPS
+
+
+def test_com_inference_timeout_answers_504_and_full_queue_429(com_api, monkeypatch):
+    client, modules, release = com_api
+    executor = InferenceExecutor(workers=1, queue_size=0, timeout=0.05)
+    monkeypatch.setattr(modules, "INFERENCE", executor)
+    monkeypatch.setattr(modules, "COM_BATCH_WINDOW_MS", 0)
+
+    # El modelo no responde a tiempo: 504 y su lugar sigue ocupado hasta que termina
+    assert client.post('/predict/com', json=WINDOW).status_code == 504
+    assert client.post('/predict/com', json=WINDOW).status_code == 429
+    assert executor.stats()['timeouts'] == 1 and executor.stats()['rejected'] == 1
@@ -0,0 +1,72 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# Mismo sys.path que la API (flask --app src/board)
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "src"))
+
+pytest.importorskip("pyarrow")
+
+from GEN.columnar import ensure_store, iter_store, max_timestamp, read_manifest, read_store  # noqa: E402
+
+
+def weather_csv(path, sep=","):
+    """CSV de prueba de tres meses cada 5 minutos, con una fila sin fecha y las filas desordenadas."""
+    dates = pd.date_range("2024-01-30 22:00", "2024-03-02 02:00", freq="5min")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "period_end": dates.strftime("%Y-%m-%d %H:%M:%S"),
+        "ghi": rng.uniform(0, 900, len(dates)).round(3),
+        "air_temp": rng.uniform(10, 30, len(dates)).round(3),
+        "note": ["x"] * len(dates),
+    }).sample(frac=1, random_state=0)
+    df.loc[df.index[0], "period_end"] = "no es una fecha"
+    df.to_csv(path, index=False, sep=sep)
+    valid = df[df["period_end"] != "no es una fecha"].copy()
+    valid["period_end"] = pd.to_datetime(valid["period_end"])
+    return valid.set_index("period_end").sort_index()
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_store_round_trip(tmp_path, fmt):
+    csv_path, store = tmp_path / "weather.csv", str(tmp_path / "weather")
+    expected = weather_csv(csv_path)
+
+    manifest = ensure_store(str(csv_path), store, "period_end", fmt=fmt, chunksize=1000)
+    assert list(manifest["partitions"]) == ["2024-01", "2024-02", "2024-03"]
+    assert manifest["columns"] == ["period_end", "ghi", "air_temp", "note"]
+    assert max_timestamp(store) == expected.index.max()
+
+    # Todas las filas con fecha, ordenadas, con sus valores y tipos
+    df = read_store(store)
+    pd.testing.assert_frame_equal(df, expected, check_names=False, check_freq=False)
+
+    # Solo las columnas y el rango pedidos, un DataFrame por mes
+    start, end = pd.Timestamp("2024-02-10"), pd.Timestamp("2024-03-01 12:00")
+    parts = list(iter_store(store, ["ghi"], start=start, end=end))
+    assert [part.index[0].month for part in parts] == [2, 3]
+    subset = pd.concat(parts)
+    assert list(subset.columns) == ["ghi"]
+    pd.testing.assert_series_equal(subset["ghi"], expected.loc[start:end, "ghi"],
+                                   check_names=False, check_freq=False)
+
+
+def test_ensure_store_converts_only_when_the_csv_changes(tmp_path):
+    csv_path, store = tmp_path / "energy.csv", str(tmp_path / "energy")
+    weather_csv(csv_path, sep=";")
+    first = ensure_store(str(csv_path), store, "period_end", sep=";")
+    written = os.path.getmtime(os.path.join(store, "_store.json"))
+
+    assert ensure_store(str(csv_path), store, "period_end", sep=";") == first
+    assert os.path.getmtime(os.path.join(store, "_store.json")) == written
+
+    # Sin el CSV se usa el almacén tal cual; con un CSV nuevo se vuelve a convertir
+    os.remove(csv_path)
+    assert ensure_store(str(csv_path), store, "period_end", sep=";") == first
+    weather_csv(csv_path, sep=";")
+    os.utime(csv_path, (first["source_mtime"] + 10, first["source_mtime"] + 10))
+    assert ensure_store(str(csv_path), store, "period_end", sep=";")["source_mtime"] == first["source_mtime"] + 10
+    assert read_manifest(store)["source_mtime"] == first["source_mtime"] + 10
@@ -0,0 +1,176 @@
+import os
+import sys
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+# Mismo sys.path que la API (flask --app src/board); proyecto_backend para
+# los scripts de entrenamiento (src.COM.*), que usan imports relativos
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "src"))
+sys.path.append(BACKEND)
+
+from GEN.precision import DTYPE, as_model_input, float32_scaler  # noqa: E402
+
+COM_MODEL = os.environ.get("COM_MODEL", "COM-3.0.keras")
+COM_DATA = os.path.join(BACKEND, "models_media", "processed_datasets", "COM")
+GEN_DATA = os.path.join(BACKEND, "models_media", "processed_datasets", "GEN")
+WEATHER_MODEL = "weather-1.0.keras"
+
+
+def leading_rows(path, n):
+    """
+    Primeras n filas (como máximo) de un .npy. Los X_test / y_test de GEN
+    del repositorio están recortados: solo se leen las filas completas
+    que contiene el archivo, sin confiar en la forma del encabezado.
+    """
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                       else np.lib.format.read_array_header_2_0)
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+    row_bytes = int(np.prod(shape[1:])) * dtype.itemsize
+    n = min(n, shape[0], (os.path.getsize(path) - offset) // row_bytes)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(n,) + tuple(shape[1:]))
+
+
+def float64_clone(model):
+    """Copia del modelo con todas las capas y pesos en float64 (la referencia de precisión)."""
+    tf = pytest.importorskip("tensorflow")
+
+    def to_float64(layer):
+        config = layer.get_config()
+        config["dtype"] = "float64"
+        if "layer" in config:  # Bidirectional: la capa interna también
+            config["layer"]["config"]["dtype"] = "float64"
+        return layer.__class__.from_config(config)
+
+    inputs = tf.keras.Input(model.input_shape[1:], dtype="float64")
+    clone = tf.keras.models.clone_model(model, input_tensors=inputs, clone_function=to_float64)
+    clone.set_weights([np.asarray(w, dtype=np.float64) for w in model.get_weights()])
+    return clone
+
+
+def saved_or_built(model_name, build):
+    """El modelo entrenado si está en proyecto_backend; si no, la misma arquitectura con pesos fijos."""
+    tf = pytest.importorskip("tensorflow")
+    path = os.path.join(BACKEND, model_name)
+    if os.path.exists(path):
+        return tf.keras.models.load_model(path)
+    tf.keras.utils.set_random_seed(0)
+    return build()
+
+
+def test_model_inputs_are_float32():
+    seqs = as_model_input([[1, 2, 3], [4.5, 5, 6]])
+    assert seqs.dtype == DTYPE
+    assert as_model_input(seqs) is seqs
+
+
+def test_float32_scaler_keeps_float32():
+    rng = np.random.default_rng(0)
+    data = rng.normal(50, 10, size=(500, 7))
+    reference = StandardScaler().fit(data)
+    scaler = float32_scaler(StandardScaler().fit(data))
+
+    sample = data[:20].astype(DTYPE)
+    scaled = scaler.transform(sample)
+    assert scaled.dtype == DTYPE
+    assert scaler.inverse_transform(scaled).dtype == DTYPE
+    np.testing.assert_allclose(scaled, reference.transform(data[:20]), atol=1e-5)
+
+
+def test_com_rollout_float32_matches_float64_loop():
+    tf = pytest.importorskip("tensorflow")
+    from COM.rollout import compile_rollout, predict_loop
+
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.Input((47, 1)),
+        tf.keras.layers.LSTM(8),
+        tf.keras.layers.Dense(1),
+    ])
+    seqs = np.random.default_rng(1).uniform(0, 3, size=(4, 47))
+
+    expected = predict_loop(model, seqs, steps=48)
+    result = compile_rollout(model, steps=48)(as_model_input(seqs))
+    assert result.dtype == DTYPE
+    np.testing.assert_allclose(result, expected, rtol=1e-4, atol=1e-4)
+
+
+def com_test_windows(n=512):
+    """
+    (x, y) de prueba de COM: x_test/y_test si están generados; si no, ventanas
+    de 47 lecturas consecutivas del y_test del repositorio y la lectura siguiente.
+    """
+    x_path, y_path = os.path.join(COM_DATA, "x_test.npy"), os.path.join(COM_DATA, "y_test.npy")
+    y = np.load(y_path)
+    if os.path.exists(x_path):
+        return np.load(x_path, mmap_mode="r")[:n], y[:n]
+    x = np.lib.stride_tricks.sliding_window_view(y, 47)[:n]
+    return x[:, :, np.newaxis], y[47:47 + n]
+
+
+def test_com_float32_accuracy_matches_float64():
+    """MSE, RMSE y R² del modelo COM con entradas float32 coinciden con la referencia float64."""
+    pytest.importorskip("tensorflow")
+    from sklearn.metrics import mean_squared_error, r2_score
+    from src.COM.COM_model import build_model
+
+    model = saved_or_built(COM_MODEL, build_model)
+    x, y = com_test_windows()
+    assert len(x) == 512
+
+    predictions = model.predict(as_model_input(x), batch_size=256, verbose=0).flatten()
+    assert predictions.dtype == DTYPE
+    reference = float64_clone(model).predict(np.asarray(x, dtype=np.float64), batch_size=256, verbose=0).flatten()
+    assert reference.dtype == np.float64
+
+    mse, expected_mse = mean_squared_error(y, predictions), mean_squared_error(y, reference)
+    assert mse == pytest.approx(expected_mse, rel=1e-4)
+    assert np.sqrt(mse) == pytest.approx(np.sqrt(expected_mse), rel=1e-4)
+    assert r2_score(y, predictions) == pytest.approx(r2_score(y, reference), abs=1e-4)
+
+
+def test_gen_float32_evaluation_matches_float64_on_committed_data():
+    """
+    Con los X_test / y_test y el scaler_y de GEN del repositorio y el
+    modelo de clima (o su arquitectura de GEN_model con pesos fijos), las
+    métricas del camino float32 (entradas, scaler y evaluate_model)
+    coinciden con la referencia float64 de sklearn.
+    """
+    import pickle
+    pytest.importorskip("tensorflow")
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+    from GEN.evaluation import evaluate_model
+    from GEN.GEN_model import build_model
+
+    with open(os.path.join(GEN_DATA, "metadata.pkl"), "rb") as f:
+        metadata = pickle.load(f)
+    with open(os.path.join(GEN_DATA, "scaler_y.pkl"), "rb") as f:
+        scaler_y = pickle.load(f)
+    horizon, target_vars = metadata["forecast_horizon"], metadata["target_vars"]
+    n_targets = len(target_vars)
+
+    X = leading_rows(os.path.join(GEN_DATA, "X_test.npy"), 64)
+    y = np.asarray(leading_rows(os.path.join(GEN_DATA, "y_test.npy"), len(X)))
+    assert len(X) >= 32
+    model = saved_or_built(WEATHER_MODEL, lambda: build_model(X.shape[1], X.shape[2], horizon, n_targets))
+
+    # Referencia: modelo y datos en float64, una variable a la vez con inverse_transform
+    predictions = float64_clone(model).predict(np.asarray(X, dtype=np.float64), verbose=0)
+    assert predictions.dtype == np.float64
+    predictions = predictions.reshape(-1, horizon, n_targets)
+    y_true = y.reshape(-1, horizon, n_targets)
+    pred_orig = scaler_y.inverse_transform(predictions.reshape(-1, n_targets))
+    true_orig = scaler_y.inverse_transform(y_true.reshape(-1, n_targets))
+
+    result = evaluate_model(model, X, y, float32_scaler(pickle.loads(pickle.dumps(scaler_y))),
+                            horizon, target_vars, batch_size=16)
+
+    for i, var in enumerate(target_vars):
+        metrics = result["per_variable"][var]
+        assert metrics["MAE"] == pytest.approx(mean_absolute_error(true_orig[:, i], pred_orig[:, i]), rel=1e-4)
+        assert metrics["RMSE"] == pytest.approx(np.sqrt(mean_squared_error(true_orig[:, i], pred_orig[:, i])), rel=1e-4)
+        assert metrics["R²"] == pytest.approx(r2_score(true_orig[:, i], pred_orig[:, i]), abs=1e-4)
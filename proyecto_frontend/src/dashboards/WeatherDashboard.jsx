@@ -179,6 +179,18 @@ function WeatherDashboard() {
     return fullDay;
   }
 
+const columnarToRows = (table) => {
+  const variables = Object.keys(table).filter(key => key !== 'timestamps');
+  const rows = {};
+  table.timestamps.forEach((timestamp, index) => {
+    rows[timestamp] = {};
+    variables.forEach(key => {
+      rows[timestamp][key] = table[key][index];
+    });
+  });
+  return rows;
+};
+
 const processWeatherPredictionData = (rawData) => {
   if (!rawData || !Array.isArray(rawData) || rawData.length === 0 || !Array.isArray(rawData[0])) {
       console.error('Invalid raw weather prediction data format:', rawData);
@@ -235,7 +247,10 @@ useEffect(() => {
         throw new Error('Formato de respuesta inesperado del backend.');
       }
 
-      const predictionsObject = data.predictions;
+      // /results responde columnar: { timestamps: [...], <variable>: [...] }
+      const predictionsObject = Array.isArray(data.predictions.timestamps)
+        ? columnarToRows(data.predictions)
+        : data.predictions;
 
       const processed = Object.keys(predictionsObject)
         .sort() // Ordena las claves (timestamps) alfabéticamente/cronológicamente